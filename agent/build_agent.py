@@ -1,25 +1,22 @@
+from functools import lru_cache
 from memory.summary_memory import get_summary_memory 
-from src.config import settings
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain.agents import initialize_agent, AgentType
+from src.llm import get_chat_llm
+from langchain.agents import AgentExecutor, initialize_agent, AgentType
 from src.prompts import system_prompt
 from tools.career_tools import rag_tool, salary_tool, resume_tool, job_explainer_tool
 from tools.profile_tools import update_user_profile_tool, get_user_profile_tool
+from tools.upload_tools import upload_search_tool
 
 
-def build_career_agent():
-    llm = ChatGoogleGenerativeAI(
-        temperature=settings.temperature,
-        model=settings.model_name,
-        google_api_key=settings.google_api_key,
-        convert_system_message_to_human=True 
-    )
-
-    memory = get_summary_memory()
+@lru_cache(maxsize=1)
+def _base_agent() -> AgentExecutor:
+    """The agent, LLM client and tools shared by every executor in the process."""
+    llm = get_chat_llm(convert_system_message_to_human=True)
 
     tools = [
         get_user_profile_tool,
         rag_tool,
+        upload_search_tool,
         salary_tool,
         resume_tool,
         job_explainer_tool,
@@ -30,7 +27,6 @@ def build_career_agent():
         tools=tools,
         llm=llm,
         agent=AgentType.CHAT_ZERO_SHOT_REACT_DESCRIPTION,
-        memory=memory,
         verbose=True,
         agent_kwargs={
             "system_message": system_prompt(),
@@ -39,3 +35,21 @@ def build_career_agent():
         max_iterations=5,  
         early_stopping_method="generate"  
     )
+
+
+def build_career_agent(memory=None, user_id: str = None) -> AgentExecutor:
+    """
+    Return an agent executor with its own conversation memory. Only the memory is
+    created per call; the agent, LLM client and tools are shared. With a user_id
+    the memory's running summary is persisted for that user.
+    """
+    base = _base_agent()
+    return AgentExecutor.from_agent_and_tools(
+        agent=base.agent,
+        tools=base.tools,
+        memory=memory or get_summary_memory(user_id),
+        tags=base.tags,
+        verbose=base.verbose,
+        max_iterations=base.max_iterations,
+        early_stopping_method=base.early_stopping_method
+    )
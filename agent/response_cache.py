@@ -0,0 +1,294 @@
+import hashlib
+import json
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+import numpy as np
+from src.config import settings
+from tools.text import normalize_query
+from tools.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+def profile_scope(profile: dict, fields: list[str]) -> str:
+    """Fingerprint of the profile fields that change what a good answer looks like."""
+    relevant = {field: str(profile[field]).strip().lower() for field in fields if profile.get(field)}
+    return hashlib.sha256(json.dumps(relevant, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def _call_with_timeout(func, arg, timeout: float):
+    """Run func(arg) on a daemon thread and give up after `timeout` seconds. A call that
+    hangs keeps its thread but never blocks the caller or interpreter shutdown."""
+    result = {}
+
+    def run():
+        try:
+            result["value"] = func(arg)
+        except Exception as e:
+            result["error"] = e
+
+    thread = threading.Thread(target=run, name="response-cache-embed", daemon=True)
+    thread.start()
+    thread.join(timeout)
+    if thread.is_alive():
+        raise TimeoutError(f"timed out after {timeout}s")
+    if "error" in result:
+        raise result["error"]
+    return result["value"]
+
+
+def _unit(vector) -> np.ndarray:
+    vector = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class InMemoryCacheBackend:
+    """Process-local LRU cache with TTL. Entries are dicts with key, scope, query, vector, response, latency."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self._entries = TTLCache(max_entries, ttl_seconds)
+
+    def get(self, key: str):
+        return self._entries.get(key)
+
+    def nearest(self, scope: str, vector: np.ndarray):
+        """Most similar cached entry in the same profile scope, with its cosine similarity."""
+        # Vectors from a different embedding model cannot be compared
+        candidates = [
+            entry for entry in self._entries.values()
+            if entry["scope"] == scope and entry.get("vector") is not None and entry["vector"].shape == vector.shape
+        ]
+        if not candidates:
+            return None, 0.0
+        matrix = np.stack([entry["vector"] for entry in candidates])
+        scores = matrix @ vector
+        best = int(np.argmax(scores))
+        self._entries.get(candidates[best]["key"])  # mark it recently used
+        return candidates[best], float(scores[best])
+
+    def set(self, entry: dict):
+        self._entries.set(entry["key"], entry)
+
+    def clear(self):
+        self._entries.clear()
+
+
+class MongoCacheBackend:
+    """
+    Cache shared by all workers, stored in a MongoDB collection. Expiry relies on
+    the TTL index on `created_at` created by database.bootstrap; LRU order is kept
+    in `last_hit` and the collection is trimmed to `max_entries` on write.
+    `collection_factory` returns None while MongoDB is unavailable; lookups then
+    miss and writes are skipped.
+    """
+
+    def __init__(self, collection_factory, max_entries: int, ttl_seconds: float, max_candidates: int = 500):
+        self._collection_factory = collection_factory
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_candidates = max_candidates
+        self._writes = 0
+
+    def _fresh(self) -> dict:
+        return {"created_at": {"$gte": datetime.now() - timedelta(seconds=self.ttl_seconds)}}
+
+    @staticmethod
+    def _from_doc(doc: dict) -> dict:
+        entry = dict(doc)
+        entry["key"] = entry.pop("_id")
+        if entry.get("vector") is not None:
+            entry["vector"] = np.asarray(entry["vector"], dtype=np.float32)
+        return entry
+
+    def get(self, key: str):
+        collection = self._collection_factory()
+        if collection is None:
+            return None
+        doc = collection.find_one_and_update(
+            {"_id": key, **self._fresh()}, {"$set": {"last_hit": datetime.now()}}
+        )
+        return self._from_doc(doc) if doc else None
+
+    def nearest(self, scope: str, vector: np.ndarray):
+        collection = self._collection_factory()
+        if collection is None:
+            return None, 0.0
+        docs = list(
+            collection.find({"scope": scope, "vector": {"$ne": None}, **self._fresh()})
+            .sort("last_hit", -1)
+            .limit(self.max_candidates)
+        )
+        docs = [doc for doc in docs if len(doc["vector"]) == len(vector)]
+        if not docs:
+            return None, 0.0
+        matrix = np.asarray([doc["vector"] for doc in docs], dtype=np.float32)
+        scores = matrix @ vector
+        best = int(np.argmax(scores))
+        collection.update_one({"_id": docs[best]["_id"]}, {"$set": {"last_hit": datetime.now()}})
+        return self._from_doc(docs[best]), float(scores[best])
+
+    def set(self, entry: dict):
+        collection = self._collection_factory()
+        if collection is None:
+            return
+        doc = dict(entry)
+        doc["_id"] = doc.pop("key")
+        if doc.get("vector") is not None:
+            doc["vector"] = [float(x) for x in doc["vector"]]
+        now = datetime.now()
+        doc["created_at"] = now
+        doc["last_hit"] = now
+        collection.replace_one({"_id": doc["_id"]}, doc, upsert=True)
+
+        # Trim occasionally rather than counting on every write
+        self._writes += 1
+        if self._writes % 100 == 0:
+            excess = collection.estimated_document_count() - self.max_entries
+            if excess > 0:
+                stale = [d["_id"] for d in collection.find({}, {"_id": 1}).sort("last_hit", 1).limit(excess)]
+                collection.delete_many({"_id": {"$in": stale}})
+
+    def clear(self):
+        collection = self._collection_factory()
+        if collection is not None:
+            collection.delete_many({})
+
+
+class ResponseCache:
+    """
+    Cache of agent answers keyed by normalized query plus the relevant profile
+    fields. An exact key match is tried first; otherwise, when an embedding client
+    is given, the most similar cached query in the same profile scope is used if
+    its cosine similarity reaches `threshold`; an embedding call that takes longer
+    than `embed_timeout` seconds is abandoned and the lookup goes on without it. Entries are shared between users, so
+    callers must only store answers that depend on nothing user-specific.
+    """
+
+    def __init__(self, backend, embeddings=None, threshold: float = 0.92, profile_fields: list[str] = None,
+                 min_words: int = 3, embed_timeout: float = 2.0):
+        self.backend = backend
+        self.embed_timeout = embed_timeout
+        self.embeddings = embeddings
+        self.threshold = threshold
+        self.profile_fields = profile_fields or []
+        self.min_words = min_words
+        self._lock = threading.Lock()
+        self._metrics = {"exact_hits": 0, "semantic_hits": 0, "misses": 0, "saved_seconds": 0.0}
+        self._recent_vectors = OrderedDict()
+
+    def _key(self, normalized: str, scope: str) -> str:
+        return hashlib.sha256(f"{scope}\0{normalized}".encode()).hexdigest()
+
+    def cacheable(self, query: str) -> bool:
+        """Very short inputs ('yes', 'tell me more') depend on the conversation, not just the query."""
+        return len(normalize_query(query).split()) >= self.min_words
+
+    def _embed(self, normalized: str):
+        if self.embeddings is None:
+            return None
+        # A miss is usually followed by store() for the same query; embed it once
+        with self._lock:
+            if normalized in self._recent_vectors:
+                return self._recent_vectors[normalized]
+        try:
+            vector = _unit(_call_with_timeout(self.embeddings.embed_query, normalized, self.embed_timeout))
+        except Exception as e:
+            logger.warning(f"Response cache embedding failed: {e}")
+            return None
+        with self._lock:
+            self._recent_vectors[normalized] = vector
+            if len(self._recent_vectors) > 256:
+                self._recent_vectors.popitem(last=False)
+        return vector
+
+    def _record(self, key: str, value: float = 1):
+        with self._lock:
+            self._metrics[key] += value
+
+    def lookup(self, query: str, profile: dict) -> str | None:
+        """Return a cached answer for this query and profile, or None."""
+        if not self.cacheable(query):
+            return None
+        normalized = normalize_query(query)
+        scope = profile_scope(profile, self.profile_fields)
+
+        entry = self.backend.get(self._key(normalized, scope))
+        if entry is not None:
+            self._record("exact_hits")
+            self._record("saved_seconds", entry.get("latency", 0.0))
+            return entry["response"]
+
+        vector = self._embed(normalized)
+        if vector is not None:
+            entry, similarity = self.backend.nearest(scope, vector)
+            if entry is not None and similarity >= self.threshold:
+                self._record("semantic_hits")
+                self._record("saved_seconds", entry.get("latency", 0.0))
+                return entry["response"]
+
+        self._record("misses")
+        return None
+
+    def store(self, query: str, profile: dict, response: str, latency: float):
+        """Remember an answer together with how long the agent took to produce it."""
+        if not self.cacheable(query):
+            return
+        normalized = normalize_query(query)
+        scope = profile_scope(profile, self.profile_fields)
+        self.backend.set({
+            "key": self._key(normalized, scope),
+            "scope": scope,
+            "query": normalized,
+            "vector": self._embed(normalized),
+            "response": response,
+            "latency": latency,
+        })
+
+    def metrics(self) -> dict:
+        with self._lock:
+            metrics = dict(self._metrics)
+        lookups = metrics["exact_hits"] + metrics["semantic_hits"] + metrics["misses"]
+        metrics["hit_rate"] = (metrics["exact_hits"] + metrics["semantic_hits"]) / lookups if lookups else 0.0
+        return metrics
+
+
+def build_response_cache():
+    """Create the cache configured in settings, or None when caching is off."""
+    backend_name = settings.response_cache_backend
+    if backend_name == "off":
+        return None
+    if backend_name == "mongo":
+        from database.connection import get_collection
+        backend = MongoCacheBackend(
+            lambda: get_collection(settings.response_cache_collection),
+            max_entries=settings.response_cache_max_entries,
+            ttl_seconds=settings.response_cache_ttl_seconds,
+        )
+    elif backend_name == "memory":
+        backend = InMemoryCacheBackend(
+            max_entries=settings.response_cache_max_entries,
+            ttl_seconds=settings.response_cache_ttl_seconds,
+        )
+    else:
+        raise ValueError(f"Unknown response cache backend '{backend_name}'")
+
+    embeddings = None
+    if settings.response_cache_semantic:
+        from tools.embeddings import get_embeddings
+        embeddings = get_embeddings()
+
+    return ResponseCache(
+        backend,
+        embeddings=embeddings,
+        threshold=settings.response_cache_threshold,
+        profile_fields=settings.response_cache_profile_fields,
+        min_words=settings.response_cache_min_words,
+        embed_timeout=settings.response_cache_embed_timeout,
+    )
+
+
+response_cache = build_response_cache()
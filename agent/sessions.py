@@ -0,0 +1,146 @@
+import threading
+import time
+from collections import OrderedDict
+
+from agent.build_agent import build_career_agent
+from src.config import settings
+
+
+def estimate_memory_bytes(agent) -> int:
+    """Rough size of an agent's conversation memory (buffered messages plus summary)."""
+    memory = agent.memory
+    if memory is None:
+        return 0
+    size = len(getattr(memory, "moving_summary_buffer", "") or "")
+    for message in memory.chat_memory.messages:
+        size += len(str(message.content))
+    return size
+
+
+class AgentSessionManager:
+    """
+    One agent executor (and so one conversation memory) per user_id. Executors share
+    the LLM client, tools and vector store. Sessions are evicted least recently used
+    first once there are more than `max_sessions`, once their estimated memory use
+    goes over `max_memory_bytes`, or after `ttl_seconds` without a request.
+    Each session's size is re-estimated when a turn is recorded with update_size(),
+    and a running total is kept so eviction never walks every session's messages.
+    """
+
+    def __init__(self, max_sessions: int, ttl_seconds: float, max_memory_bytes: int, factory=build_career_agent):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.max_memory_bytes = max_memory_bytes
+        self._factory = factory
+        self._sessions = OrderedDict()  # user_id -> [agent, last_used, size]
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def _live(self, user_id: str, now: float):
+        session = self._sessions.get(user_id)
+        if session is not None and now - session[1] <= self.ttl_seconds:
+            return session
+        return None
+
+    def get_agent(self, user_id: str):
+        """Return the user's agent, creating it on first use."""
+        now = time.monotonic()
+        with self._lock:
+            session = self._live(user_id, now)
+            if session is not None:
+                session[1] = now
+                self._sessions.move_to_end(user_id)
+                return session[0]
+
+        # Built outside the lock so a slow build does not hold up other users
+        agent = self._factory(user_id=user_id)
+        with self._lock:
+            now = time.monotonic()
+            session = self._live(user_id, now)
+            if session is not None:
+                # Another request for this user finished building first
+                session[1] = now
+                self._sessions.move_to_end(user_id)
+                return session[0]
+            evicted = [self._pop(user_id)] if user_id in self._sessions else []
+            size = estimate_memory_bytes(agent)
+            self._sessions[user_id] = [agent, now, size]
+            self._total_bytes += size
+            evicted += self._evict(now)
+        _discard(evicted)
+        return agent
+
+    def find_agent(self, user_id: str):
+        """The user's live agent, or None; unlike get_agent this never creates one."""
+        with self._lock:
+            session = self._live(user_id, time.monotonic())
+            return session[0] if session is not None else None
+
+    def update_size(self, user_id: str):
+        """Re-estimate a session's memory after a turn was saved to it, evicting others if needed."""
+        with self._lock:
+            session = self._sessions.get(user_id)
+            if session is None:
+                return
+            size = estimate_memory_bytes(session[0])
+            self._total_bytes += size - session[2]
+            session[2] = size
+            evicted = self._evict(time.monotonic())
+        _discard(evicted)
+
+    def end_session(self, user_id: str):
+        """Forget a user's conversation memory (e.g. on logout or 'New Chat')."""
+        with self._lock:
+            agent = self._pop(user_id) if user_id in self._sessions else None
+        _discard([agent] if agent is not None else [])
+
+    def evict_expired(self):
+        with self._lock:
+            evicted = self._evict(time.monotonic())
+        _discard(evicted)
+
+    def _pop(self, user_id: str):
+        agent, _, size = self._sessions.pop(user_id)
+        self._total_bytes -= size
+        return agent
+
+    def _pop_oldest(self):
+        return self._pop(next(iter(self._sessions)))
+
+    def _evict(self, now: float) -> list:
+        """Drop expired and over-limit sessions; returns their agents (called with the lock held)."""
+        evicted = [
+            self._pop(user_id)
+            for user_id, (_, last_used, _) in list(self._sessions.items())
+            if now - last_used > self.ttl_seconds
+        ]
+        while len(self._sessions) > self.max_sessions:
+            evicted.append(self._pop_oldest())
+        while self._total_bytes > self.max_memory_bytes and len(self._sessions) > 1:
+            evicted.append(self._pop_oldest())
+        self.evictions += len(evicted)
+        return evicted
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "evictions": self.evictions,
+                "memory_bytes": self._total_bytes,
+            }
+
+
+def _discard(agents: list):
+    """Stop background work of ended sessions so nothing is saved for them afterwards."""
+    for agent in agents:
+        memory = agent.memory
+        if hasattr(memory, "discard"):
+            memory.discard()
+
+
+session_manager = AgentSessionManager(
+    max_sessions=settings.agent_session_max,
+    ttl_seconds=settings.agent_session_ttl_seconds,
+    max_memory_bytes=settings.agent_session_max_memory_mb * 1024 * 1024,
+)
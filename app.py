@@ -1,12 +1,9 @@
 import streamlit as st
 import asyncio
-import concurrent.futures
 import os
 import base64
 import time
 from io import StringIO
-import PyPDF2
-import docx
 from pathlib import Path
 from styles import StreamlitChatTheme, ThemePresets
 
@@ -26,10 +23,18 @@ def setup_event_loop():
 setup_event_loop()
 
 # Import modules after event loop setup
-from main import handle_user_input_async
+from main import handle_user_input_async, stream_user_input_async
+from agent.sessions import session_manager
+from src.config import settings
+from src.event_loop import iterate_async, run_coroutine
+from documents.extraction import extract_document_text
+from documents.upload_cache import upload_cache, upload_key
+from documents.upload_index import upload_index_store
+from memory.summary_memory import clear_conversation_summary
 from database.logger import (
     create_user, authenticate_user, 
-    save_streamlit_chat_history, load_streamlit_chat_history
+    append_streamlit_chat_messages, clear_streamlit_chat_history, load_streamlit_chat_history_page,
+    count_streamlit_chat_messages
 )
 
 def get_base64_of_bin_file(bin_file):
@@ -49,54 +54,54 @@ def load_css():
         st.warning("CSS file not found. Using default styling.")
 
 def run_async_in_thread(coro):
-    """Run an async function in a separate thread with its own event loop."""
-    def run_in_thread():
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            return loop.run_until_complete(coro)
-        finally:
-            loop.close()
-    
-    with concurrent.futures.ThreadPoolExecutor() as executor:
-        future = executor.submit(run_in_thread)
-        return future.result()
+    """Run an async function on the shared background event loop and wait for the result."""
+    return run_coroutine(coro)
 
 def extract_text_from_pdf(file_bytes):
-    """Extract text from PDF file."""
+    """Extract text from PDF file, up to the upload token budget."""
     try:
-        from io import BytesIO
-        pdf_reader = PyPDF2.PdfReader(BytesIO(file_bytes))
-        text = ""
-        for page in pdf_reader.pages:
-            text += page.extract_text()
-        return text
+        return extract_document_text(file_bytes, "application/pdf")
     except Exception as e:
         return f"Error reading PDF: {str(e)}"
 
 def extract_text_from_docx(file_bytes):
-    """Extract text from DOCX file."""
+    """Extract text from DOCX file, up to the upload token budget."""
     try:
-        from io import BytesIO
-        doc = docx.Document(BytesIO(file_bytes))
-        text = ""
-        for paragraph in doc.paragraphs:
-            text += paragraph.text + "\n"
-        return text
+        return extract_document_text(file_bytes, "application/vnd.openxmlformats-officedocument.wordprocessingml.document")
     except Exception as e:
         return f"Error reading DOCX: {str(e)}"
 
-def render_message(speaker, message, is_user=False):
-    """Render a single chat message"""
+def cached_upload_text(document_key):
+    """Text extracted from an earlier upload of the same file, or None."""
+    if upload_cache is None:
+        return None
+    try:
+        return upload_cache.get_text(document_key)
+    except Exception:
+        return None
+
+def cache_upload_text(document_key, text):
+    if upload_cache is not None:
+        try:
+            upload_cache.put_text(document_key, text)
+        except Exception as e:
+            st.warning(f"Could not cache the document: {e}")
+
+def message_html(message, is_user=False):
+    """HTML for a single chat message bubble"""
     message_class = "user" if is_user else "bot"
     avatar = "👤" if is_user else "🤖"
     
-    st.markdown(f"""
+    return f"""
     <div class="message {message_class}">
         <div class="message-avatar">{avatar}</div>
         <div class="message-bubble">{message}</div>
     </div>
-    """, unsafe_allow_html=True)
+    """
+
+def render_message(speaker, message, is_user=False, container=st):
+    """Render a single chat message"""
+    container.markdown(message_html(message, is_user), unsafe_allow_html=True)
 
 def render_welcome_message():
     """Render the welcome message with clickable feature items"""
@@ -166,8 +171,11 @@ def render_auth_form():
                         st.session_state.authenticated = True
                         st.session_state.username = username
                         st.session_state.user_id = username
-                        # Load chat history
-                        st.session_state.chat_history = load_streamlit_chat_history(username)
+                        # Load the newest page of chat history; older pages load on demand
+                        reset_chat_window()
+                        st.session_state.chat_history, st.session_state.history_cursor = (
+                            load_streamlit_chat_history_page(username, limit=settings.chat_history_page_size)
+                        )
                         st.success("Login successful!")
                         st.rerun()
                     else:
@@ -233,6 +241,24 @@ def render_auth_form():
     </div>
     """, unsafe_allow_html=True)
 
+def reset_chat_window():
+    """Forget loaded-history pagination state (login, new chat, clear chat)."""
+    st.session_state.history_cursor = None
+    st.session_state.render_count = settings.chat_render_window
+
+def load_older_messages():
+    """Widen the rendered window, fetching the next older page from the database
+    once everything already in session state is visible."""
+    st.session_state.render_count += settings.chat_render_window
+    if (st.session_state.render_count > len(st.session_state.chat_history)
+            and st.session_state.history_cursor is not None):
+        older, st.session_state.history_cursor = load_streamlit_chat_history_page(
+            st.session_state.username,
+            before_seq=st.session_state.history_cursor,
+            limit=settings.chat_history_page_size
+        )
+        st.session_state.chat_history = older + st.session_state.chat_history
+
 def render_sidebar():
     """Render collapsible sidebar with chat controls"""
     with st.sidebar:
@@ -254,18 +280,27 @@ def render_sidebar():
             if st.button("📄 Analyze Document", use_container_width=True):
                 with st.spinner("Processing document..."):
                     file_bytes = uploaded_file.read()
+                    document_key = upload_key(file_bytes)
                     
-                    if uploaded_file.type == "application/pdf":
-                        extracted_text = extract_text_from_pdf(file_bytes)
-                    elif uploaded_file.type in ["application/vnd.openxmlformats-officedocument.wordprocessingml.document", "application/msword"]:
-                        extracted_text = extract_text_from_docx(file_bytes)
-                    else:
-                        extracted_text = "Unsupported file type"
+                    # A file uploaded before is not parsed again
+                    extracted_text = cached_upload_text(document_key)
+                    if extracted_text is None:
+                        if uploaded_file.type == "application/pdf":
+                            extracted_text = extract_text_from_pdf(file_bytes)
+                        elif uploaded_file.type in ["application/vnd.openxmlformats-officedocument.wordprocessingml.document", "application/msword"]:
+                            extracted_text = extract_text_from_docx(file_bytes)
+                        else:
+                            extracted_text = "Unsupported file type"
+                        if not extracted_text.startswith("Error") and extracted_text != "Unsupported file type":
+                            cache_upload_text(document_key, extracted_text)
                     
                     # Add document analysis to chat
                     if not extracted_text.startswith("Error"):
-                        analysis_prompt = f"Please analyze this document and provide career advice:\n\n{extracted_text[:2000]}..."
-                        st.session_state.pending_analysis = analysis_prompt
+                        # The full text goes to the handler, which summarizes it for the agent
+                        st.session_state.pending_analysis = f"Please analyze my document '{uploaded_file.name}' and provide career advice."
+                        st.session_state.pending_document = extracted_text
+                        st.session_state.pending_document_key = document_key
+                        st.session_state.pending_document_name = uploaded_file.name
                         st.success(f"Document '{uploaded_file.name}' processed successfully!")
                     else:
                         st.error(extracted_text)
@@ -274,22 +309,34 @@ def render_sidebar():
         
         # New Chat button
         if st.button("🆕 New Chat", use_container_width=True, key="new_chat_btn"):
+            session_manager.end_session(st.session_state.user_id)
+            upload_index_store.drop(st.session_state.username)
             st.session_state.chat_history = []
-            save_streamlit_chat_history(st.session_state.username, [])
+            reset_chat_window()
+            clear_streamlit_chat_history(st.session_state.username)
+            clear_conversation_summary(st.session_state.user_id)
             st.rerun()
         
         # Clear Chat button
         if st.session_state.chat_history:
             if st.button("🗑️ Clear Chat", use_container_width=True, key="clear_chat_btn"):
+                session_manager.end_session(st.session_state.user_id)
+                upload_index_store.drop(st.session_state.username)
                 st.session_state.chat_history = []
-                save_streamlit_chat_history(st.session_state.username, [])
+                reset_chat_window()
+                clear_streamlit_chat_history(st.session_state.username)
+                clear_conversation_summary(st.session_state.user_id)
                 st.rerun()
         
         # Chat History Info
         if st.session_state.chat_history:
+            # Only the newest page is loaded, so the total comes from the database
+            message_count = count_streamlit_chat_messages(st.session_state.username)
+            if message_count is None:
+                message_count = len(st.session_state.chat_history)
             st.markdown(f"""
             <div class="chat-info">
-                <p>📊 Messages: {len(st.session_state.chat_history)}</p>
+                <p>📊 Messages: {message_count}</p>
             </div>
             """, unsafe_allow_html=True)
         
@@ -304,8 +351,8 @@ def render_sidebar():
         
         # Logout button
         if st.button("🚪 Logout", use_container_width=True, key="logout_btn"):
-            # Save chat history before logout
-            save_streamlit_chat_history(st.session_state.username, st.session_state.chat_history)
+            session_manager.end_session(st.session_state.user_id)
+            upload_index_store.drop(st.session_state.username)
             # Clear session state
             for key in list(st.session_state.keys()):
                 del st.session_state[key]
@@ -335,12 +382,25 @@ def render_main_interface():
     st.markdown('<div class="chat-container" id="chat-container">', unsafe_allow_html=True)
     
     if st.session_state.chat_history:
-        for speaker, message in st.session_state.chat_history:
+        # Only the newest `render_count` messages are rendered on each rerun
+        visible_history = st.session_state.chat_history[-st.session_state.render_count:]
+        has_older = (
+            len(visible_history) < len(st.session_state.chat_history)
+            or st.session_state.history_cursor is not None
+        )
+        if has_older and st.button("⬆️ Load older messages", key="load_older_btn"):
+            load_older_messages()
+            st.rerun()
+        
+        for speaker, message in visible_history:
             is_user = "You" in speaker
             render_message(speaker, message, is_user)
     else:
         render_welcome_message()
     
+    # Streaming responses for the next submission are rendered here
+    stream_placeholder = st.empty()
+    
     st.markdown('</div>', unsafe_allow_html=True)
     
     # Processing indicator (positioned above input)
@@ -390,10 +450,43 @@ def render_main_interface():
     st.markdown('</div>', unsafe_allow_html=True)
 
 
-    return submit_button, user_input
+    return submit_button, user_input, stream_placeholder
 
-def handle_chat_submission(user_input):
-    """Handle chat form submission"""
+def stream_response(user_input, placeholder, document_text=None, document_key=None, document_name=None):
+    """Render the agent's answer token by token into `placeholder` and return the full text."""
+    with placeholder.container():
+        render_message("👤 You", user_input, is_user=True)
+        bot_slot = st.empty()
+    render_message("🤖 Mentora", "<em>Thinking...</em>", container=bot_slot)
+    
+    streamed = ""
+    response = None
+    for event in iterate_async(
+        stream_user_input_async(
+            st.session_state.user_id,
+            user_input,
+            username=st.session_state.username,
+            document_text=document_text,
+            document_key=document_key,
+            document_name=document_name
+        )
+    ):
+        if event["type"] == "token":
+            streamed += event["text"]
+            render_message("🤖 Mentora", streamed + "▌", container=bot_slot)
+        elif event["type"] == "tool_start" and not streamed:
+            render_message("🤖 Mentora", f"<em>Consulting {event['tool']}...</em>", container=bot_slot)
+        elif event["type"] == "final":
+            response = event["text"]
+            render_message("🤖 Mentora", response, container=bot_slot)
+    return response or streamed
+
+def handle_chat_submission(user_input, stream_placeholder=None, document_text=None, document_key=None,
+                           document_name=None):
+    """Handle chat form submission. With a placeholder (and settings.stream_responses)
+    the answer is rendered progressively while it is generated. document_text is the
+    text of an uploaded document the message refers to, document_key its upload cache
+    key and document_name its file name."""
     # Set processing state
     st.session_state.is_processing = True
     
@@ -401,25 +494,31 @@ def handle_chat_submission(user_input):
     st.session_state.chat_history.append(("👤 You", user_input))
     
     try:
-        # Get response from agent (pass username for activity tracking)
-        response = run_async_in_thread(
-            handle_user_input_async(
-                st.session_state.user_id, 
-                user_input, 
-                username=st.session_state.username
+        if stream_placeholder is not None and settings.stream_responses:
+            response = stream_response(user_input, stream_placeholder, document_text, document_key, document_name)
+        else:
+            # Get response from agent (pass username for activity tracking)
+            response = run_async_in_thread(
+                handle_user_input_async(
+                    st.session_state.user_id, 
+                    user_input, 
+                    username=st.session_state.username,
+                    document_text=document_text,
+                    document_key=document_key,
+                    document_name=document_name
+                )
             )
-        )
         
         # Add bot response to history
         st.session_state.chat_history.append(("🤖 Mentora", response))
         
-        # Save to database
-        save_streamlit_chat_history(st.session_state.username, st.session_state.chat_history)
+        # Save only this turn to the database
+        append_streamlit_chat_messages(st.session_state.username, st.session_state.chat_history[-2:])
         
     except Exception as e:
         error_message = f"⚠️ Sorry, I encountered an error: {str(e)}"
         st.session_state.chat_history.append(("🤖 Mentora", error_message))
-        save_streamlit_chat_history(st.session_state.username, st.session_state.chat_history)
+        append_streamlit_chat_messages(st.session_state.username, st.session_state.chat_history[-2:])
         st.error(f"Error: {e}")
     
     # Reset processing state
@@ -431,6 +530,10 @@ def initialize_session_state():
         st.session_state.authenticated = False
     if "chat_history" not in st.session_state:
         st.session_state.chat_history = []
+    if "history_cursor" not in st.session_state:
+        st.session_state.history_cursor = None
+    if "render_count" not in st.session_state:
+        st.session_state.render_count = settings.chat_render_window
     if "user_id" not in st.session_state:
         st.session_state.user_id = None
     if "username" not in st.session_state:
@@ -439,6 +542,12 @@ def initialize_session_state():
         st.session_state.is_processing = False
     if "pending_analysis" not in st.session_state:
         st.session_state.pending_analysis = None
+    if "pending_document" not in st.session_state:
+        st.session_state.pending_document = None
+    if "pending_document_key" not in st.session_state:
+        st.session_state.pending_document_key = None
+    if "pending_document_name" not in st.session_state:
+        st.session_state.pending_document_name = None
     if "sidebar_collapsed" not in st.session_state:
         st.session_state.sidebar_collapsed = False
 
@@ -463,19 +572,27 @@ def main():
     
     # Handle pending document analysis
     if st.session_state.pending_analysis and st.session_state.authenticated:
-        handle_chat_submission(st.session_state.pending_analysis)
+        handle_chat_submission(
+            st.session_state.pending_analysis,
+            document_text=st.session_state.pending_document,
+            document_key=st.session_state.pending_document_key,
+            document_name=st.session_state.pending_document_name
+        )
         st.session_state.pending_analysis = None
+        st.session_state.pending_document = None
+        st.session_state.pending_document_key = None
+        st.session_state.pending_document_name = None
         st.rerun()
     
     # Route to appropriate interface
     if not st.session_state.authenticated:
         render_auth_form()
     else:
-        submit_button, user_input = render_main_interface()
+        submit_button, user_input, stream_placeholder = render_main_interface()
         
         # Process user input
         if submit_button and user_input and user_input.strip() and not st.session_state.is_processing:
-            handle_chat_submission(user_input)
+            handle_chat_submission(user_input, stream_placeholder)
             st.rerun()
 
     # JavaScript for enhanced UX - COMPLETE AND ENHANCED
@@ -0,0 +1,72 @@
+import argparse
+import time
+
+import faiss
+import numpy as np
+from src.config import settings
+from tools.ann_index import build_index
+
+
+def clustered_vectors(count: int, dim: int, clusters: int, seed: int = 0) -> np.ndarray:
+    """Synthetic embeddings grouped around random centres, L2-normalised like real ones."""
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((clusters, dim)).astype(np.float32)
+    vectors = centres[rng.integers(0, clusters, count)] + 0.5 * rng.standard_normal((count, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def measure(index, queries: np.ndarray, truth: np.ndarray, k: int) -> tuple[float, float]:
+    """recall@k against exact search, and mean latency per single query in ms."""
+    start = time.perf_counter()
+    found = np.vstack([index.search(query[None, :], k)[1] for query in queries])
+    latency_ms = (time.perf_counter() - start) / len(queries) * 1000
+    recall = np.mean([len(set(f) & set(t)) / k for f, t in zip(found, truth)])
+    return float(recall), latency_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recall against latency and memory for FAISS index types.")
+    parser.add_argument("--vectors", type=int, default=50000)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=settings.retriever_k)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 4, 8, 16, 32])
+    parser.add_argument("--ef-search", type=int, nargs="+", default=[16, 32, 64, 128])
+    args = parser.parse_args()
+
+    vectors = clustered_vectors(args.vectors + args.queries, args.dim, clusters=max(10, args.vectors // 500))
+    corpus, queries = vectors[:args.vectors], vectors[args.vectors:]
+    params = {
+        "flat": {},
+        "ivf": {"type": "ivf", "nlist": settings.ivf_nlist},
+        "ivfpq": {"type": "ivfpq", "nlist": settings.ivf_nlist, "pq_m": settings.pq_m, "pq_nbits": settings.pq_nbits},
+        "hnsw": {"type": "hnsw", "m": settings.hnsw_m, "ef_construction": settings.hnsw_ef_construction},
+    }
+
+    print(f"{'index':>6} {'param':>12} {'build s':>8} {'MB':>8} {'recall@k':>9} {'query ms':>9}")
+    truth = None
+    for name, index_params in params.items():
+        start = time.perf_counter()
+        index = build_index(corpus, index_params)
+        build_seconds = time.perf_counter() - start
+        size_mb = faiss.serialize_index(index).nbytes / 1e6
+
+        if name == "flat":
+            truth = np.vstack([index.search(query[None, :], args.k)[1] for query in queries])
+            sweep = [("exact", None)]
+        elif name == "hnsw":
+            sweep = [(f"efSearch={ef}", ef) for ef in args.ef_search]
+        else:
+            sweep = [(f"nprobe={nprobe}", nprobe) for nprobe in args.nprobe]
+
+        for label, value in sweep:
+            if name == "hnsw":
+                index.hnsw.efSearch = value
+            elif value is not None:
+                faiss.extract_index_ivf(index).nprobe = value
+            recall, latency_ms = measure(index, queries, truth, args.k)
+            print(f"{name:>6} {label:>12} {build_seconds:>8.1f} {size_mb:>8.1f} {recall:>9.3f} {latency_ms:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
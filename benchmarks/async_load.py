@@ -0,0 +1,97 @@
+import argparse
+import asyncio
+import os
+import time
+
+# Keep the benchmark offline: no document index, no real credentials needed
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark")
+os.environ.setdefault("MONGO_URI", "mongodb://localhost:27017")
+os.environ["CAREER_SOURCES"] = "[]"
+
+from langchain.agents import AgentExecutor, AgentType, initialize_agent
+from langchain.memory import ConversationBufferMemory
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+import main
+from agent.build_agent import _base_agent
+
+
+class StubChatModel(BaseChatModel):
+    """Answers immediately with a final answer after a fixed simulated model latency."""
+
+    latency: float = 0.5
+
+    @property
+    def _llm_type(self) -> str:
+        return "stub-chat-model"
+
+    def _result(self) -> ChatResult:
+        message = AIMessage(content="Thought: I know the answer.\nFinal Answer: Keep building your skills.")
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        time.sleep(self.latency)
+        return self._result()
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        await asyncio.sleep(self.latency)
+        return self._result()
+
+
+def stub_agent_factory(latency: float):
+    llm = StubChatModel(latency=latency)
+    tools = _base_agent().tools
+
+    def factory(user_id: str = None) -> AgentExecutor:
+        return initialize_agent(
+            tools=tools,
+            llm=llm,
+            agent=AgentType.CHAT_ZERO_SHOT_REACT_DESCRIPTION,
+            memory=ConversationBufferMemory(memory_key="chat_history", return_messages=True),
+            max_iterations=5,
+        )
+    return factory
+
+
+def stub_db_write(latency: float):
+    def write(*args, **kwargs):
+        time.sleep(latency)
+    return write
+
+
+async def run_level(concurrency: int, requests: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        async with semaphore:
+            await main.handle_user_input_async(f"user-{i % concurrency}", "What should I learn next?", username=f"user-{i % concurrency}")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    return requests / (time.perf_counter() - start)
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Requests per second of handle_user_input_async against concurrency.")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--requests", type=int, default=64)
+    parser.add_argument("--llm-latency", type=float, default=0.5)
+    parser.add_argument("--db-latency", type=float, default=0.005)
+    args = parser.parse_args()
+
+    main.session_manager._factory = stub_agent_factory(args.llm_latency)
+    main.log_chat = stub_db_write(args.db_latency)
+    main.update_user_last_activity = stub_db_write(args.db_latency)
+    # Measure the agent path: identical questions would otherwise be cache hits
+    main.response_cache = None
+
+    print(f"{'concurrency':>11} {'req/s':>8}")
+    for concurrency in args.concurrency:
+        rps = asyncio.run(run_level(concurrency, args.requests))
+        print(f"{concurrency:>11} {rps:>8.1f}")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,46 @@
+import argparse
+import asyncio
+from types import SimpleNamespace
+
+from src.config import settings
+from documents.summarization import summarize_document
+from tools.chunking import estimate_tokens
+
+
+class FakeLLM:
+    """Offline stand-in for the chat model: fixed latency, records the largest prompt it was sent."""
+
+    def __init__(self, latency: float, words: int = 120):
+        self.latency = latency
+        self.words = words
+        self.max_prompt_tokens = 0
+
+    async def ainvoke(self, prompt: str):
+        self.max_prompt_tokens = max(self.max_prompt_tokens, estimate_tokens(prompt))
+        await asyncio.sleep(self.latency)
+        return SimpleNamespace(content=" ".join(["note"] * self.words))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-stage timings of map-reduce document summarization.")
+    parser.add_argument("--pages", type=int, default=60, help="Synthetic document length in pages")
+    parser.add_argument("--latency", type=float, default=0.5, help="Seconds per LLM call")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    page = " ".join(f"Worked as analyst {i} delivering reports." for i in range(60))
+    text = "\n\n".join(page for _ in range(args.pages))
+    print(f"document: {estimate_tokens(text)} tokens")
+
+    print(f"{'workers':>8} {'chunks':>7} {'calls':>6} {'split s':>8} {'map s':>7} {'reduce s':>9} "
+          f"{'total s':>8} {'max prompt':>11}")
+    for workers in args.concurrency:
+        settings.summary_max_concurrency = workers
+        llm = FakeLLM(args.latency)
+        _, t = asyncio.run(summarize_document(text, llm=llm))
+        print(f"{workers:>8} {t['chunks']:>7} {t['llm_calls']:>6} {t['split']:>8.2f} {t['map']:>7.2f} "
+              f"{t['reduce']:>9.2f} {t['total']:>8.2f} {llm.max_prompt_tokens:>11}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import argparse
+import random
+import threading
+import time
+
+from langchain_core.embeddings import Embeddings
+from tools.embeddings import BatchedEmbeddings, HashingEmbeddings, SentenceTransformerEmbeddings
+from src.config import settings
+
+
+class QuotaExceeded(Exception):
+    def __str__(self):
+        return "429 Resource has been exhausted (e.g. check quota)."
+
+
+class FakeRemoteEmbeddings(Embeddings):
+    """Offline stand-in for a remote embedding API: fixed per-call latency, a cap on
+    in-flight calls and a configurable rate of quota errors."""
+
+    def __init__(self, latency: float = 0.05, per_text: float = 0.0005, error_rate: float = 0.0,
+                 server_concurrency: int = 8, size: int = 768):
+        self.latency = latency
+        self.per_text = per_text
+        self.error_rate = error_rate
+        self.size = size
+        self._slots = threading.Semaphore(server_concurrency)
+
+    def embed_documents(self, texts):
+        if random.random() < self.error_rate:
+            raise QuotaExceeded()
+        with self._slots:
+            time.sleep(self.latency + self.per_text * len(texts))
+        return [[float(len(text) % 7)] * self.size for text in texts]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+def local_backends() -> dict:
+    backends = {"hashing": HashingEmbeddings(dim=settings.hashing_embedding_dim)}
+    try:
+        backends["sentence-transformers"] = SentenceTransformerEmbeddings(settings.local_embedding_model)
+    except ImportError:
+        print("sentence-transformers not installed, skipping it")
+    return backends
+
+
+def bench_local(texts: list[str], queries: int = 200):
+    """Batch encoding throughput and single-query latency of the local backends."""
+    backends = local_backends()
+    print(f"{'backend':>22} {'texts/s':>9} {'query ms':>9}")
+    for name, client in backends.items():
+        start = time.perf_counter()
+        client.embed_documents(texts)
+        throughput = len(texts) / (time.perf_counter() - start)
+        start = time.perf_counter()
+        for i in range(queries):
+            client.embed_query(f"how do I change careers {i}")
+        latency_ms = (time.perf_counter() - start) / queries * 1000
+        print(f"{name:>22} {throughput:>9.0f} {latency_ms:>9.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline embedding throughput benchmark.")
+    parser.add_argument("--texts", type=int, default=2000)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[16, 64, 100])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--error-rate", type=float, default=0.02)
+    parser.add_argument("--local", action="store_true", help="Benchmark the local embedding backends instead")
+    args = parser.parse_args()
+
+    texts = [f"career chunk {i} " * 20 for i in range(args.texts)]
+    if args.local:
+        bench_local(texts)
+        return
+    fake = FakeRemoteEmbeddings(error_rate=args.error_rate)
+
+    print(f"{'batch':>6} {'workers':>8} {'seconds':>8} {'texts/s':>9} {'retries':>8}")
+    for batch_size in args.batch_sizes:
+        for workers in args.concurrency:
+            client = BatchedEmbeddings(fake, batch_size=batch_size, max_concurrency=workers,
+                                       backoff_base=0.05, backoff_max=0.5)
+            client.embed_documents(texts)
+            m = client.metrics()
+            print(f"{batch_size:>6} {workers:>8} {m['seconds']:>8.2f} {m['texts_per_second']:>9.0f} {m['retries']:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+import argparse
+import time
+
+from langchain_community.vectorstores import FAISS
+from src.config import settings
+from tools.chunking import split_documents
+from tools.embeddings import get_embeddings
+from tools.hybrid_search import HybridSearcher, get_reranker
+from benchmarks.retrieval_precision import QUESTIONS, load_corpus
+
+
+def evaluate(searcher: HybridSearcher, docstore, ks: list[int]) -> dict:
+    """recall@k (questions with a relevant chunk in the top k), precision at the largest k and search latency."""
+    hits = {k: 0 for k in ks}
+    precision, latency = 0.0, 0.0
+    for question, keywords in QUESTIONS:
+        start = time.perf_counter()
+        ids = searcher.search_ids(question, max(ks))
+        latency += time.perf_counter() - start
+        relevant = [any(kw in docstore.search(doc_id).page_content.lower() for kw in keywords) for doc_id in ids]
+        for k in ks:
+            hits[k] += any(relevant[:k])
+        precision += sum(relevant) / max(len(relevant), 1)
+    n = len(QUESTIONS)
+    return {"recall": {k: hits[k] / n for k in ks}, "precision": precision / n, "latency_ms": latency / n * 1000}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="recall@k and latency of vector, BM25 and hybrid retrieval.")
+    parser.add_argument("--ks", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--rerankers", nargs="+", default=["off", "coverage"])
+    args = parser.parse_args()
+
+    chunks = split_documents(load_corpus())
+    vectorstore = FAISS.from_documents(chunks, get_embeddings())
+
+    configs = [("vector", "off"), ("bm25", "off")] + [("hybrid", name) for name in args.rerankers]
+    recall_header = " ".join(f"{f'R@{k}':>6}" for k in args.ks)
+    print(f"{'mode':>8} {'reranker':>13} {recall_header} {f'P@{max(args.ks)}':>6} {'ms':>7}")
+    for mode, reranker in configs:
+        searcher = HybridSearcher(vectorstore, mode=mode, candidates=settings.hybrid_candidates,
+                                  rrf_k=settings.rrf_k, reranker=get_reranker(reranker, settings.reranker_model))
+        result = evaluate(searcher, vectorstore.docstore, args.ks)
+        recall = " ".join(f"{result['recall'][k]:>6.2f}" for k in args.ks)
+        print(f"{mode:>8} {reranker:>13} {recall} {result['precision']:>6.2f} {result['latency_ms']:>7.2f}")
+
+
+if __name__ == "__main__":
+    main()
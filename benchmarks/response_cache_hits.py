@@ -0,0 +1,115 @@
+import argparse
+import asyncio
+import os
+import random
+import zlib
+
+# Keep the benchmark offline: no document index, no real credentials needed
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark")
+os.environ.setdefault("MONGO_URI", "mongodb://localhost:27017")
+os.environ["CAREER_SOURCES"] = "[]"
+
+from langchain.agents import AgentExecutor, AgentType, initialize_agent
+from langchain.memory import ConversationBufferMemory
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.tools import Tool
+
+import main
+from agent.response_cache import InMemoryCacheBackend, ResponseCache
+from benchmarks.async_load import StubChatModel, stub_db_write
+
+TOOL_ACTION = 'Thought: I should look this up.\nAction:\n```\n{"action": "Lookup", "action_input": "careers"}\n```'
+FINAL_ANSWER = "Thought: I know the answer.\nFinal Answer: Keep building your skills."
+
+
+class ToolUsingChatModel(StubChatModel):
+    """Calls the Lookup tool first for the given share of questions, then answers."""
+
+    tool_rate: float = 0.5
+
+    def _result_for(self, messages) -> ChatResult:
+        prompt = str(messages[-1].content)
+        question = prompt.split("\n\n", 1)[0]
+        uses_tool = zlib.crc32(question.encode()) % 1000 < self.tool_rate * 1000
+        content = TOOL_ACTION if uses_tool and "Observation:" not in prompt else FINAL_ANSWER
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=content))])
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        return self._result_for(messages)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        return self._result_for(messages)
+
+
+def agent_factory(tool_rate: float):
+    llm = ToolUsingChatModel(latency=0, tool_rate=tool_rate)
+    tools = [Tool(name="Lookup", func=lambda query: "Career facts.", description="Looks up career facts.")]
+
+    def factory(user_id: str = None) -> AgentExecutor:
+        return initialize_agent(
+            tools=tools,
+            llm=llm,
+            agent=AgentType.CHAT_ZERO_SHOT_REACT_DESCRIPTION,
+            memory=ConversationBufferMemory(memory_key="chat_history", return_messages=True),
+            max_iterations=5,
+        )
+    return factory
+
+
+async def simulate(args) -> dict:
+    rng = random.Random(args.seed)
+    questions = [f"What skills do I need for career path number {i}?" for i in range(args.questions)]
+    weights = [1 / (rank + 1) ** args.zipf for rank in range(args.questions)]
+    hits = {"first": [0, 0], "later": [0, 0]}  # position -> [hits, turns]
+
+    for user in range(args.users):
+        user_id = f"user-{user}"
+        role = f"role-{user % args.roles}"
+        main.get_user_profile = lambda username, role=role: {"role": role}
+        for turn in range(args.turns):
+            question = rng.choices(questions, weights)[0]
+            before = main.response_cache.metrics()
+            await main.handle_user_input_async(user_id, question, username=user_id)
+            after = main.response_cache.metrics()
+            hit = (after["exact_hits"] + after["semantic_hits"]) > (before["exact_hits"] + before["semantic_hits"])
+            position = hits["first" if turn == 0 else "later"]
+            position[0] += hit
+            position[1] += 1
+    return hits
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(
+        description="Response cache hit rate over simulated chat sessions. Only tool-free first turns can hit."
+    )
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--turns", type=int, default=4, help="Questions per user session")
+    parser.add_argument("--questions", type=int, default=50, help="Distinct questions in the pool")
+    parser.add_argument("--zipf", type=float, default=1.1, help="Popularity skew of the question pool")
+    parser.add_argument("--roles", type=int, default=5, help="Distinct profile roles (cache scopes)")
+    parser.add_argument("--tool-rate", type=float, nargs="+", default=[0.0, 0.5, 0.9])
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    main.log_chat = stub_db_write(0)
+    main.update_user_last_activity = stub_db_write(0)
+    main.load_conversation_summary = lambda user_id: ""
+
+    print(f"{'tool rate':>9} {'first-turn hits':>16} {'later-turn hits':>16} {'overall':>8}")
+    for tool_rate in args.tool_rate:
+        main.session_manager._factory = agent_factory(tool_rate)
+        for user in range(args.users):
+            main.session_manager.end_session(f"user-{user}")
+        main.response_cache = ResponseCache(
+            InMemoryCacheBackend(max_entries=10000, ttl_seconds=86400), profile_fields=["role"]
+        )
+        hits = asyncio.run(simulate(args))
+        first, later = hits["first"], hits["later"]
+        overall = (first[0] + later[0]) / max(first[1] + later[1], 1)
+        print(f"{tool_rate:>9.1f} {first[0] / max(first[1], 1):>16.1%} {later[0] / max(later[1], 1):>16.1%} "
+              f"{overall:>8.1%}")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,69 @@
+import argparse
+import os
+import time
+
+from langchain_community.document_loaders import TextLoader, PyMuPDFLoader
+from langchain_community.vectorstores import FAISS
+from src.config import settings
+from tools.chunking import estimate_tokens, split_documents
+from tools.embeddings import get_embeddings
+
+# Fixed question set: a retrieved passage counts as relevant if it mentions any keyword.
+QUESTIONS = [
+    ("What careers suit introverts?", ["introvert"]),
+    ("How do I use transferable skills when changing careers?", ["transferable skills"]),
+    ("How can networking help my job search?", ["networking", "network"]),
+    ("How should I write a CV?", ["cv"]),
+    ("How do I prepare for a job interview?", ["interview"]),
+    ("How can volunteering help my career?", ["volunteer"]),
+    ("How do I use LinkedIn to find work?", ["linkedin"]),
+    ("How do I identify my strengths?", ["strength"]),
+    ("What should I consider before becoming self-employed?", ["self-employ"]),
+    ("How do my values affect career choice?", ["values"]),
+]
+
+
+def load_corpus() -> list:
+    docs = []
+    for source in settings.career_sources:
+        if os.path.exists(source):
+            loader = PyMuPDFLoader(source) if source.endswith(".pdf") else TextLoader(source)
+            docs += loader.load()
+    return docs
+
+
+def evaluate(vectorstore, k: int) -> dict:
+    """Mean precision@k, prompt tokens and search latency over QUESTIONS."""
+    precision, tokens, latency = 0.0, 0, 0.0
+    for question, keywords in QUESTIONS:
+        start = time.perf_counter()
+        results = vectorstore.similarity_search(question, k=k)
+        latency += time.perf_counter() - start
+        relevant = [doc for doc in results if any(kw in doc.page_content.lower() for kw in keywords)]
+        precision += len(relevant) / max(len(results), 1)
+        tokens += sum(estimate_tokens(doc.page_content) for doc in results)
+    n = len(QUESTIONS)
+    return {"precision": precision / n, "tokens": tokens / n, "latency_ms": latency / n * 1000}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Retrieval precision against prompt tokens per query.")
+    parser.add_argument("--chunk-sizes", type=int, nargs="+", default=[150, 300, 600])
+    parser.add_argument("--k", type=int, default=settings.retriever_k)
+    args = parser.parse_args()
+
+    embeddings = get_embeddings()
+    documents = load_corpus()
+
+    # chunk size 0 is the unsplit baseline (whole pages / whole files)
+    print(f"{'chunk_size':>10} {'chunks':>7} {'precision@k':>12} {'tokens/query':>13} {'search ms':>10}")
+    for chunk_size in [0] + args.chunk_sizes:
+        chunks = documents if chunk_size == 0 else split_documents(documents, chunk_size=chunk_size)
+        vectorstore = FAISS.from_documents(chunks, embeddings)
+        result = evaluate(vectorstore, args.k)
+        print(f"{chunk_size or 'pages':>10} {len(chunks):>7} {result['precision']:>12.2f} "
+              f"{result['tokens']:>13.0f} {result['latency_ms']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+import argparse
+
+from src.config import settings
+from database.connection import get_database, health_check, pool_metrics
+
+
+def ensure_indexes():
+    """Create every index the app relies on. Idempotent; run once per deployment."""
+    db = get_database()
+    if db is None:
+        raise RuntimeError("MongoDB client is not configured")
+
+    users_collection = db[settings.users_collection]
+    users_collection.create_index("username", unique=True)
+    users_collection.create_index("email", unique=True)
+
+    chat_history_collection = db[settings.chat_history_collection]
+    chat_history_collection.create_index([("username", 1), ("timestamp", 1)])
+    chat_history_collection.create_index(
+        [("username", 1), ("seq", 1)],
+        unique=True,
+        partialFilterExpression={"seq": {"$exists": True}}
+    )
+
+    db[settings.mongo_collection].create_index([("user_id", 1), ("timestamp", -1)])
+
+    response_cache = db[settings.response_cache_collection]
+    response_cache.create_index("created_at", expireAfterSeconds=settings.response_cache_ttl_seconds)
+    response_cache.create_index([("scope", 1), ("last_hit", -1)])
+    response_cache.create_index("last_hit")
+
+    db[settings.upload_cache_collection].create_index("last_hit")
+    db["user_profiles_collection"].create_index("username", unique=True)
+    get_database(settings.user_profiles_collection)["user_profiles"].create_index("username", unique=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check MongoDB connectivity and create indexes.")
+    parser.add_argument("--check", action="store_true", help="Only run the health check")
+    args = parser.parse_args()
+
+    health = health_check()
+    if not health["ok"]:
+        raise SystemExit(f"MongoDB health check failed: {health['error']}")
+    print(f"MongoDB reachable ({health['latency_ms']:.1f} ms)")
+
+    if not args.check:
+        ensure_indexes()
+        print("Indexes are in place.")
+    print(f"Pool: {pool_metrics()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+import logging
+import threading
+import time
+
+from pymongo import MongoClient
+from pymongo.monitoring import ConnectionPoolListener
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class PoolMetricsListener(ConnectionPoolListener):
+    """Counts connection pool events so pool usage can be inspected at runtime."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = {
+            "created": 0, "closed": 0, "checked_out": 0, "checked_in": 0,
+            "checkout_failed": 0, "pools_cleared": 0,
+        }
+
+    def _inc(self, key: str):
+        with self._lock:
+            self.counts[key] += 1
+
+    def pool_created(self, event): pass
+    def pool_ready(self, event): pass
+    def pool_closed(self, event): pass
+    def pool_cleared(self, event): self._inc("pools_cleared")
+    def connection_created(self, event): self._inc("created")
+    def connection_ready(self, event): pass
+    def connection_closed(self, event): self._inc("closed")
+    def connection_check_out_started(self, event): pass
+    def connection_check_out_failed(self, event): self._inc("checkout_failed")
+    def connection_checked_out(self, event): self._inc("checked_out")
+    def connection_checked_in(self, event): self._inc("checked_in")
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counts = dict(self.counts)
+        counts["open"] = counts["created"] - counts["closed"]
+        counts["in_use"] = counts["checked_out"] - counts["checked_in"]
+        return counts
+
+
+_client = None
+_client_lock = threading.Lock()
+_pool_listener = PoolMetricsListener()
+_available = None  # result of the last ping, None before the first one
+_checked_at = 0.0
+_available_lock = threading.Lock()
+
+
+def get_client() -> MongoClient | None:
+    """
+    Return the process-wide MongoClient, creating it on first use. Creating the
+    client does no network I/O; connections are opened lazily by the pool.
+    Returns None if the client cannot be configured (e.g. an invalid URI).
+    """
+    global _client
+    if _client is not None:
+        return _client
+    with _client_lock:
+        if _client is None:
+            try:
+                _client = MongoClient(
+                    settings.mongo_uri,
+                    maxPoolSize=settings.mongo_max_pool_size,
+                    minPoolSize=settings.mongo_min_pool_size,
+                    maxIdleTimeMS=settings.mongo_max_idle_time_ms,
+                    connectTimeoutMS=settings.mongo_connect_timeout_ms,
+                    serverSelectionTimeoutMS=settings.mongo_server_selection_timeout_ms,
+                    socketTimeoutMS=settings.mongo_socket_timeout_ms,
+                    waitQueueTimeoutMS=settings.mongo_wait_queue_timeout_ms,
+                    event_listeners=[_pool_listener],
+                    appname="mentora",
+                )
+            except Exception as e:
+                logger.error(f"MongoDB client configuration failed: {e}")
+                return None
+    return _client
+
+
+def get_database(name: str = None):
+    """Return a database handle on the shared client (settings.mongo_db by default)."""
+    client = get_client()
+    if client is None:
+        return None
+    return client[name or settings.mongo_db]
+
+
+def is_available() -> bool:
+    """
+    Whether MongoDB answered a ping. The server is pinged on first use and, after
+    a failed ping, again at most every mongo_offline_recheck_seconds, so while it
+    is down callers fall back at once instead of each waiting for a timeout.
+    """
+    global _available, _checked_at
+    if _available or (
+        _available is False and time.monotonic() - _checked_at < settings.mongo_offline_recheck_seconds
+    ):
+        return _available
+    with _available_lock:
+        if _available is None or (
+            _available is False and time.monotonic() - _checked_at >= settings.mongo_offline_recheck_seconds
+        ):
+            health = health_check()
+            if not health["ok"]:
+                logger.error(f"MongoDB is unavailable, using offline fallbacks: {health['error']}")
+            _available, _checked_at = health["ok"], time.monotonic()
+    return _available
+
+
+def get_collection(name: str, database: str = None):
+    """Return a collection on the shared client, or None while MongoDB is unavailable."""
+    if not is_available():
+        return None
+    db = get_database(database)
+    return db[name] if db is not None else None
+
+
+def health_check() -> dict:
+    """Ping the server and report whether it answered and how long it took."""
+    client = get_client()
+    if client is None:
+        return {"ok": False, "latency_ms": None, "error": "MongoDB client is not configured"}
+    start = time.perf_counter()
+    try:
+        client.admin.command("ping")
+        return {"ok": True, "latency_ms": (time.perf_counter() - start) * 1000, "error": None}
+    except Exception as e:
+        return {"ok": False, "latency_ms": (time.perf_counter() - start) * 1000, "error": str(e)}
+
+
+def pool_metrics() -> dict:
+    """Connection pool counters since the client was created, plus the configured limits."""
+    metrics = _pool_listener.snapshot()
+    metrics["max_pool_size"] = settings.mongo_max_pool_size
+    metrics["min_pool_size"] = settings.mongo_min_pool_size
+    return metrics
@@ -1,45 +1,28 @@
-from pymongo import MongoClient
+from pymongo import ReturnDocument
 from pymongo.errors import DuplicateKeyError, PyMongoError
 from datetime import datetime
 import hashlib
 import streamlit as st
 from src.config import settings
+from database.connection import get_collection
+from database.write_behind import write_queue
 
-# Connect to MongoDB
-try:
-    client = MongoClient(settings.mongo_uri)
-    db = client[settings.mongo_db]
-    
-    # Collections
-    collection = db[settings.mongo_collection]  # Original chat logs
-    users_collection = db[settings.users_collection]  # User accounts
-    chat_history_collection = db[settings.chat_history_collection]  # Streamlit chat history
-    
-    # Test connection
-    client.admin.command('ping')
-    
-    # Create indexes for users collection
-    users_collection.create_index("username", unique=True)
-    users_collection.create_index("email", unique=True)
-    
-    # Create index for chat history
-    chat_history_collection.create_index([("username", 1), ("timestamp", 1)])
-    
-except Exception as e:
-    st.error(f"MongoDB connection failed: {e}")
-    client = None
+# Collections are looked up on the shared, lazily connected client when used;
+# each function falls back to an empty result while MongoDB is unavailable.
+# Indexes are created by `python -m database.bootstrap`, not on import.
 
 def is_first_time_user(user_id: str) -> bool:
     """
     Returns True if user has no chat history in the database.
     """
-    if not client:
+    collection = get_collection(settings.mongo_collection)
+    if collection is None:
         return True
     return collection.count_documents({"user_id": user_id}) == 0
 
 def log_chat(user_id: str, question: str, answer: str):
     """Log chat interaction (original function)"""
-    if not client:
+    if get_collection(settings.mongo_collection) is None:
         return
     
     doc = {
@@ -48,13 +31,15 @@ def log_chat(user_id: str, question: str, answer: str):
         "question": question,
         "answer": answer
     }
-    collection.insert_one(doc)
+    # Batched in the background unless write_behind_mode is "sync"
+    write_queue.insert(settings.mongo_collection, doc)
 
 def get_chat_history(user_id: str, limit: int = 10):
     """
     Returns the last `limit` chat entries for the given user, sorted from newest to oldest.
     """
-    if not client:
+    collection = get_collection(settings.mongo_collection)
+    if collection is None:
         return []
     
     cursor = (
@@ -66,7 +51,8 @@ def get_chat_history(user_id: str, limit: int = 10):
 
 def clear_chat_history(user_id: str):
     """Clear chat history for a user"""
-    if not client:
+    collection = get_collection(settings.mongo_collection)
+    if collection is None:
         return 0
     
     result = collection.delete_many({"user_id": user_id})
@@ -80,7 +66,8 @@ def hash_password(password: str) -> str:
 
 def create_user(username: str, email: str, password: str) -> tuple[bool, str]:
     """Create a new user"""
-    if not client:
+    users_collection = get_collection(settings.users_collection)
+    if users_collection is None:
         return False, "Database connection failed!"
     
     try:
@@ -108,7 +95,8 @@ def create_user(username: str, email: str, password: str) -> tuple[bool, str]:
 
 def authenticate_user(username: str, password: str) -> bool:
     """Authenticate user login"""
-    if not client:
+    users_collection = get_collection(settings.users_collection)
+    if users_collection is None:
         return False
     
     try:
@@ -132,44 +120,88 @@ def authenticate_user(username: str, password: str) -> bool:
         st.error(f"Authentication error: {e}")
         return False
 
-def save_streamlit_chat_history(username: str, chat_history: list) -> bool:
-    """Save Streamlit chat history to MongoDB"""
-    if not client:
+def allocate_chat_sequence(username: str, count: int) -> int:
+    """Reserve `count` consecutive sequence numbers for a user's chat history and
+    return the first one. Numbers are never reused, even after the history is cleared."""
+    counters_collection = get_collection(settings.counters_collection)
+    if counters_collection is None:
+        raise RuntimeError("MongoDB is unavailable")
+    counter = counters_collection.find_one_and_update(
+        {"_id": f"chat_history:{username}"},
+        {"$inc": {"seq": count}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    return counter["seq"] - count + 1
+
+def append_streamlit_chat_messages(username: str, messages: list) -> bool:
+    """Append new (speaker, message) pairs to the user's stored chat history"""
+    chat_history_collection = get_collection(settings.chat_history_collection)
+    if chat_history_collection is None:
         return False
+    if not messages:
+        return True
     
     try:
-        # Clear existing history for this user
-        chat_history_collection.delete_many({"username": username})
-        
-        # Save new history
-        if chat_history:
-            chat_docs = []
-            for speaker, message in chat_history:
-                chat_docs.append({
-                    "username": username,
-                    "speaker": speaker,
-                    "message": message,
-                    "timestamp": datetime.now()
-                })
-            
-            chat_history_collection.insert_many(chat_docs)
-        
+        first_seq = allocate_chat_sequence(username, len(messages))
+        now = datetime.now()
+        chat_history_collection.insert_many([
+            {
+                "username": username,
+                "seq": first_seq + offset,
+                "speaker": speaker,
+                "message": message,
+                "timestamp": now
+            }
+            for offset, (speaker, message) in enumerate(messages)
+        ], ordered=True)
         return True
         
     except Exception as e:
         st.error(f"Error saving chat history: {e}")
         return False
 
+def clear_streamlit_chat_history(username: str) -> bool:
+    """Delete the user's stored chat history"""
+    chat_history_collection = get_collection(settings.chat_history_collection)
+    if chat_history_collection is None:
+        return False
+    
+    try:
+        chat_history_collection.delete_many({"username": username})
+        return True
+    except Exception as e:
+        st.error(f"Error clearing chat history: {e}")
+        return False
+
+def save_streamlit_chat_history(username: str, chat_history: list) -> bool:
+    """Replace the user's whole stored chat history. Prefer append_streamlit_chat_messages
+    for new turns; this rewrites every message."""
+    return clear_streamlit_chat_history(username) and append_streamlit_chat_messages(username, chat_history)
+
+def count_streamlit_chat_messages(username: str) -> int | None:
+    """Number of messages in the user's stored chat history, or None if it cannot be counted"""
+    chat_history_collection = get_collection(settings.chat_history_collection)
+    if chat_history_collection is None:
+        return None
+    
+    try:
+        return chat_history_collection.count_documents({"username": username})
+    except Exception as e:
+        st.error(f"Error counting chat history: {e}")
+        return None
+
 def load_streamlit_chat_history(username: str) -> list:
     """Load Streamlit chat history from MongoDB"""
-    if not client:
+    chat_history_collection = get_collection(settings.chat_history_collection)
+    if chat_history_collection is None:
         return []
     
     try:
-        # Get chat history ordered by timestamp
+        # Get chat history in append order
         chat_docs = chat_history_collection.find(
             {"username": username}
-        ).sort("timestamp", 1)
+        ).sort([("seq", 1), ("timestamp", 1), ("_id", 1)])
         
         results = [(doc["speaker"], doc["message"]) for doc in chat_docs]
         return results if results else []
@@ -178,9 +210,41 @@ def load_streamlit_chat_history(username: str) -> list:
         st.error(f"Error loading chat history: {e}")
         return []
 
+def load_streamlit_chat_history_page(username: str, before_seq: int = None, limit: int = 50) -> tuple[list, int | None]:
+    """
+    Load one page of chat history: the newest `limit` messages older than
+    `before_seq` (or the newest overall), oldest first. Also returns the cursor
+    to pass as `before_seq` for the next older page, or None when there is none.
+    """
+    chat_history_collection = get_collection(settings.chat_history_collection)
+    if chat_history_collection is None:
+        return [], None
+    
+    try:
+        query = {"username": username}
+        if before_seq is not None:
+            query["seq"] = {"$lt": before_seq}
+        chat_docs = list(
+            chat_history_collection.find(query, {"seq": 1, "speaker": 1, "message": 1})
+            .sort("seq", -1)
+            .limit(limit + 1)
+        )
+        has_more = len(chat_docs) > limit
+        chat_docs = chat_docs[:limit]
+        chat_docs.reverse()
+        
+        results = [(doc["speaker"], doc["message"]) for doc in chat_docs]
+        cursor = chat_docs[0].get("seq") if has_more and chat_docs else None
+        return results, cursor
+        
+    except Exception as e:
+        st.error(f"Error loading chat history: {e}")
+        return [], None
+
 def get_user_info(username: str) -> dict:
     """Get user information"""
-    if not client:
+    users_collection = get_collection(settings.users_collection)
+    if users_collection is None:
         return {}
     
     try:
@@ -195,28 +259,32 @@ def get_user_info(username: str) -> dict:
 
 def update_user_last_activity(username: str):
     """Update user's last activity timestamp"""
-    if not client:
+    if get_collection(settings.users_collection) is None:
         return
     
     try:
-        users_collection.update_one(
+        # Coalesced with other pending activity updates for this user
+        write_queue.update(
+            settings.users_collection,
             {"username": username},
             {"$set": {"last_activity": datetime.now()}}
         )
     except Exception as e:
         pass  # Silent fail for this non-critical operation
 
-    # Profiles collection
-profiles_collection = db["user_profiles_collection"]
-profiles_collection.create_index("username", unique=True)
-
 def get_user_profile(username: str) -> dict:
     """Return current user profile dictionary."""
+    profiles_collection = get_collection("user_profiles_collection")
+    if profiles_collection is None:
+        return {}
     profile_doc = profiles_collection.find_one({"username": username}, {"_id": 0, "username": 0})
     return profile_doc or {}
 
 def update_user_profile(username: str, key: str, value: str) -> bool:
     """Update or add a field in the user profile."""
+    profiles_collection = get_collection("user_profiles_collection")
+    if profiles_collection is None:
+        return False
     result = profiles_collection.update_one(
         {"username": username},
         {"$set": {key: value}},
@@ -0,0 +1,59 @@
+import argparse
+
+from pymongo import UpdateOne
+from src.config import settings
+from database.connection import get_collection
+from database.logger import allocate_chat_sequence
+
+
+def migrate_chat_history_sequences(batch_size: int = 1000) -> int:
+    """
+    Give every chat history message written before append-only storage a `seq`
+    number, preserving the old timestamp order. Safe to run repeatedly and while
+    the app is serving: legacy messages are numbered to sort before any message
+    that already has a sequence number. Returns the number of messages updated.
+    """
+    chat_history_collection = get_collection(settings.chat_history_collection)
+    if chat_history_collection is None:
+        raise RuntimeError("MongoDB connection failed!")
+
+    updated = 0
+    usernames = chat_history_collection.distinct("username", {"seq": {"$exists": False}})
+    for username in usernames:
+        legacy = list(
+            chat_history_collection.find({"username": username, "seq": {"$exists": False}}, {"_id": 1})
+            .sort([("timestamp", 1), ("_id", 1)])
+        )
+        if not legacy:
+            continue
+
+        oldest_sequenced = chat_history_collection.find_one(
+            {"username": username, "seq": {"$exists": True}}, sort=[("seq", 1)]
+        )
+        if oldest_sequenced is not None:
+            first_seq = oldest_sequenced["seq"] - len(legacy)
+        else:
+            first_seq = allocate_chat_sequence(username, len(legacy))
+
+        ops = [
+            UpdateOne({"_id": doc["_id"], "seq": {"$exists": False}}, {"$set": {"seq": first_seq + offset}})
+            for offset, doc in enumerate(legacy)
+        ]
+        for start in range(0, len(ops), batch_size):
+            result = chat_history_collection.bulk_write(ops[start:start + batch_size], ordered=False)
+            updated += result.modified_count
+    return updated
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run MongoDB data migrations.")
+    parser.add_argument("migration", choices=["chat-history-seq"])
+    args = parser.parse_args()
+
+    if args.migration == "chat-history-seq":
+        count = migrate_chat_history_sequences()
+        print(f"Assigned sequence numbers to {count} chat message(s).")
+
+
+if __name__ == "__main__":
+    main()
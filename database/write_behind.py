@@ -0,0 +1,157 @@
+import atexit
+import logging
+import threading
+
+from pymongo import InsertOne, UpdateOne
+from src.config import settings
+from database.connection import get_database
+
+logger = logging.getLogger(__name__)
+
+MODES = ("async", "sync")
+
+
+def merge_updates(earlier: dict, later: dict) -> dict:
+    """One update document with the effect of applying `earlier` and then `later`."""
+    merged = {operator: dict(fields) for operator, fields in earlier.items()}
+    for operator, fields in later.items():
+        target = merged.setdefault(operator, {})
+        for field, value in fields.items():
+            if operator == "$inc" and field in target:
+                value = target[field] + value
+            target[field] = value
+    return merged
+
+
+class WriteBehindQueue:
+    """
+    Buffers analytics-grade writes (chat logs, activity timestamps) and applies
+    them in periodic batches from a background thread.
+
+    - Updates with the same collection and filter are coalesced into one: the
+      fields of each operator are merged (later values win, $inc amounts add up).
+    - Each flush sends one unordered bulk_write per collection holding both its
+      inserts and its coalesced updates.
+    - The buffer is bounded: when it holds `max_buffer` writes the caller flushes
+      synchronously, so memory stays bounded under load instead of dropping data.
+    - mode="sync" bypasses the buffer and writes immediately (the old behaviour),
+      raising if the write fails.
+    - Pending writes are flushed on interpreter shutdown.
+    """
+
+    def __init__(self, flush_interval: float, max_buffer: int, mode: str = "async", database_factory=get_database):
+        if mode not in MODES:
+            raise ValueError(f"Unknown write-behind mode '{mode}', expected one of {MODES}")
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self.mode = mode
+        self._database_factory = database_factory
+        self._inserts = {}  # collection -> [doc]
+        self._updates = {}  # (collection, filter key) -> (filter, update)
+        self._size = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = False
+        self._thread = None
+        self.metrics = {"queued": 0, "written": 0, "flushes": 0, "failed": 0, "sync_flushes": 0}
+
+    def insert(self, collection: str, doc: dict):
+        if self.mode == "sync":
+            self._write(collection, [InsertOne(doc)])
+            return
+        with self._lock:
+            self._inserts.setdefault(collection, []).append(doc)
+            self._size += 1
+            self.metrics["queued"] += 1
+        self._after_enqueue()
+
+    def update(self, collection: str, filter: dict, update: dict):
+        if self.mode == "sync":
+            self._write(collection, [UpdateOne(filter, update)])
+            return
+        key = (collection, tuple(sorted(filter.items())))
+        with self._lock:
+            if key in self._updates:
+                update = merge_updates(self._updates[key][1], update)
+            else:
+                self._size += 1
+            self._updates[key] = (filter, update)
+            self.metrics["queued"] += 1
+        self._after_enqueue()
+
+    def _after_enqueue(self):
+        self._ensure_thread()
+        with self._lock:
+            full = self._size >= self.max_buffer
+            if full:
+                self.metrics["sync_flushes"] += 1
+        if full:
+            self.flush()
+
+    def _ensure_thread(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None and not self._stopped:
+                    self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        while not self._stopped:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def _write(self, collection: str, operations: list):
+        db = self._database_factory()
+        if db is None:
+            return
+        try:
+            db[collection].bulk_write(operations, ordered=False)
+        except Exception as e:
+            with self._lock:
+                self.metrics["failed"] += len(operations)
+            logger.error(f"Write-behind batch to '{collection}' failed ({len(operations)} ops): {e}")
+            if self.mode == "sync":
+                raise
+            return
+        with self._lock:
+            self.metrics["written"] += len(operations)
+
+    def flush(self):
+        """Write everything buffered so far. Safe to call from any thread."""
+        with self._flush_lock:
+            with self._lock:
+                inserts, self._inserts = self._inserts, {}
+                updates, self._updates = self._updates, {}
+                self._size = 0
+            if not inserts and not updates:
+                return
+
+            by_collection = {}
+            for collection, docs in inserts.items():
+                by_collection.setdefault(collection, []).extend(InsertOne(doc) for doc in docs)
+            for (collection, _), (filter, update) in updates.items():
+                by_collection.setdefault(collection, []).append(UpdateOne(filter, update))
+
+            for collection, operations in by_collection.items():
+                self._write(collection, operations)
+            with self._lock:
+                self.metrics["flushes"] += 1
+
+    def close(self):
+        """Stop the background thread and flush whatever is still buffered."""
+        self._stopped = True
+        self._wake.set()
+        self.flush()
+
+    def pending(self) -> int:
+        return self._size
+
+
+write_queue = WriteBehindQueue(
+    flush_interval=settings.write_behind_flush_interval,
+    max_buffer=settings.write_behind_max_buffer,
+    mode=settings.write_behind_mode,
+)
+atexit.register(write_queue.close)
@@ -0,0 +1,139 @@
+import math
+import multiprocessing
+import os
+import tempfile
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+
+import docx
+import pymupdf
+from src.config import settings
+from documents.pdf_pages import extract_page_range
+from tools.chunking import estimate_tokens
+
+PDF_TYPES = {"application/pdf"}
+DOCX_TYPES = {
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "application/msword",
+}
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _worker_count() -> int:
+    return min(settings.extraction_workers, os.cpu_count() or 1)
+
+
+def get_extraction_pool() -> ProcessPoolExecutor:
+    """Process pool shared by all uploads, created on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: forking a process that runs Streamlit and the event loop threads is unsafe
+            _pool = ProcessPoolExecutor(
+                max_workers=_worker_count(),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def _pages_needed(max_tokens: int | None, used: int, pages_read: int) -> float:
+    """Pages still needed to fill the budget, at the average page size read so far."""
+    if max_tokens is None:
+        return math.inf
+    per_page = max(used / pages_read, 1) if pages_read else 1
+    return math.ceil(max(max_tokens - used, 0) / per_page)
+
+
+def iter_pdf_pages(file_bytes: bytes, max_tokens: int = None):
+    """
+    Yield page texts in order, parsing each page only when it is requested. Pages
+    are parsed here until the rest of the token budget would still need at least
+    pdf_parallel_min_pages more pages; only then do pool workers take over, with
+    no more pages in flight than the remaining budget is estimated to need.
+    """
+    step = settings.pdf_pages_per_task
+    used = 0
+    with pymupdf.open(stream=file_bytes, filetype="pdf") as pdf:
+        page_count = pdf.page_count
+        for number in range(page_count):
+            needed = _pages_needed(max_tokens, used, number)
+            if needed <= 0:
+                return
+            if (number >= step and _worker_count() > 1
+                    and min(needed, page_count - number) >= settings.pdf_parallel_min_pages):
+                break
+            text = pdf[number].get_text()
+            used += estimate_tokens(text)
+            yield text
+        else:
+            return
+
+    # Large budget left: workers parse ranges of pages from a temporary copy.
+    # Stopping early leaves the ranges that were never submitted unparsed.
+    fd, path = tempfile.mkstemp(suffix=".pdf")
+    with os.fdopen(fd, "wb") as f:
+        f.write(file_bytes)
+    pool = get_extraction_pool()
+    pages_read, next_page = number, number
+    pending = deque()  # (future, page count)
+    try:
+        while next_page < page_count or pending:
+            in_flight = sum(count for _, count in pending)
+            needed = _pages_needed(max_tokens, used, pages_read)
+            while (next_page < page_count and len(pending) < _worker_count()
+                   and (not pending or in_flight < needed)):
+                stop = min(next_page + step, page_count)
+                pending.append((pool.submit(extract_page_range, path, next_page, stop), stop - next_page))
+                in_flight += stop - next_page
+                next_page = stop
+            future, _ = pending.popleft()
+            for text in future.result():
+                used += estimate_tokens(text)
+                pages_read += 1
+                yield text
+            if _pages_needed(max_tokens, used, pages_read) <= 0:
+                return
+    finally:
+        for future, _ in pending:
+            future.cancel()
+        os.unlink(path)
+
+
+def iter_docx_paragraphs(file_bytes: bytes):
+    for paragraph in docx.Document(BytesIO(file_bytes)).paragraphs:
+        yield paragraph.text
+
+
+def iter_document_text(file_bytes: bytes, file_type: str, max_tokens: int = None):
+    """Yield the text of an uploaded PDF or Word file piece by piece (pages or paragraphs)."""
+    if file_type in PDF_TYPES:
+        return iter_pdf_pages(file_bytes, max_tokens)
+    if file_type in DOCX_TYPES:
+        return iter_docx_paragraphs(file_bytes)
+    raise ValueError(f"Unsupported file type '{file_type}'")
+
+
+def take_tokens(pieces, max_tokens: int) -> str:
+    """Join pieces until `max_tokens` (estimated) is reached, cutting the last piece to fit."""
+    parts, used = [], 0
+    for piece in pieces:
+        remaining = max_tokens - used
+        if remaining <= 0:
+            break
+        if estimate_tokens(piece) > remaining:
+            piece = piece[:remaining * 4]
+        parts.append(piece)
+        used += estimate_tokens(piece)
+    if hasattr(pieces, "close"):
+        pieces.close()
+    return "\n".join(parts)
+
+
+def extract_document_text(file_bytes: bytes, file_type: str, max_tokens: int = None) -> str:
+    """Text of an uploaded document, reading no further than the token budget."""
+    budget = settings.upload_max_tokens if max_tokens is None else max_tokens
+    return take_tokens(iter_document_text(file_bytes, file_type, budget), budget)
@@ -0,0 +1,10 @@
+import pymupdf
+
+
+def extract_page_range(path: str, start: int, stop: int) -> list[str]:
+    """
+    Text of pages [start, stop) of the PDF at `path`. Runs in the extraction pool's
+    spawned workers, which import this module fresh, so it imports only pymupdf.
+    """
+    with pymupdf.open(path) as pdf:
+        return [pdf[number].get_text() for number in range(start, stop)]
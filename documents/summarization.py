@@ -0,0 +1,94 @@
+import asyncio
+import logging
+import time
+
+from src.config import settings
+from src.llm import get_chat_llm
+from tools.chunking import estimate_tokens, get_text_splitter
+
+logger = logging.getLogger(__name__)
+
+MAP_PROMPT = """You are preparing notes on part {part} of {parts} of a document a user uploaded to a career advisor (for example a CV, cover letter or report).
+Extract everything relevant for career advice: roles and dates, skills, qualifications, achievements, goals, and any gaps or weaknesses.
+Write concise bullet points and keep names, numbers and job titles exactly as written.
+
+Document part:
+{text}"""
+
+REDUCE_PROMPT = """Combine these notes on consecutive parts of an uploaded document into one brief for a career advisor.
+Start with one line saying what kind of document it is, then group the points under: Experience, Skills & Qualifications, Achievements, Goals, Gaps or Concerns.
+Merge duplicates, keep names, numbers and job titles exactly, and stay under {max_tokens} tokens.
+
+Notes:
+{text}"""
+
+
+async def _call(llm, prompt: str, semaphore: asyncio.Semaphore, timings: dict) -> str:
+    async with semaphore:
+        timings["llm_calls"] += 1
+        message = await asyncio.wait_for(llm.ainvoke(prompt), settings.summary_call_timeout)
+    return message.content
+
+
+async def _reduce(llm, summaries: list[str], semaphore: asyncio.Semaphore, timings: dict) -> str:
+    """Merge summaries in groups that fit the reduce budget until a single brief is left."""
+    budget = settings.summary_reduce_tokens
+    while True:
+        groups, current = [], []
+        for summary in summaries:
+            if current and estimate_tokens("\n\n".join(current + [summary])) > budget:
+                groups.append(current)
+                current = []
+            current.append(summary)
+        groups.append(current)
+        if len(groups) == len(summaries) > 1:
+            # Nothing fits together; merge everything in one call rather than looping
+            groups = [summaries]
+
+        merged = await asyncio.gather(*[
+            _call(llm, REDUCE_PROMPT.format(text="\n\n".join(group), max_tokens=settings.summary_brief_tokens),
+                  semaphore, timings)
+            for group in groups
+        ])
+        if len(merged) == 1:
+            return merged[0]
+        summaries = merged
+
+
+async def summarize_document(text: str, llm=None) -> tuple[str, dict]:
+    """
+    Map-reduce summary of an uploaded document: the text is split into chunks,
+    each chunk is summarized concurrently (at most summary_max_concurrency calls
+    in flight) and the chunk notes are reduced to one compact brief.
+    Documents that fit in a single chunk are returned unchanged.
+    Returns (brief, timings) where timings holds seconds per stage and counts.
+    """
+    llm = llm or get_chat_llm(temperature=0)
+    timings = {"chunks": 0, "llm_calls": 0, "split": 0.0, "map": 0.0, "reduce": 0.0, "total": 0.0}
+    started = time.perf_counter()
+
+    chunks = get_text_splitter(chunk_size=settings.summary_chunk_tokens, chunk_overlap=0).split_text(text)
+    timings["chunks"] = len(chunks)
+    timings["split"] = time.perf_counter() - started
+    if len(chunks) <= 1:
+        timings["total"] = time.perf_counter() - started
+        return text, timings
+
+    semaphore = asyncio.Semaphore(settings.summary_max_concurrency)
+    stage = time.perf_counter()
+    notes = await asyncio.gather(*[
+        _call(llm, MAP_PROMPT.format(part=number, parts=len(chunks), text=chunk), semaphore, timings)
+        for number, chunk in enumerate(chunks, start=1)
+    ])
+    timings["map"] = time.perf_counter() - stage
+
+    stage = time.perf_counter()
+    brief = await _reduce(llm, notes, semaphore, timings)
+    timings["reduce"] = time.perf_counter() - stage
+    timings["total"] = time.perf_counter() - started
+
+    logger.info(
+        f"Summarized document: {timings['chunks']} chunks, {timings['llm_calls']} LLM calls, "
+        f"split {timings['split']:.2f}s, map {timings['map']:.2f}s, reduce {timings['reduce']:.2f}s"
+    )
+    return brief, timings
@@ -0,0 +1,151 @@
+import hashlib
+import threading
+from datetime import datetime
+
+import bson
+from src.config import settings
+from tools.embeddings import embedding_model_id
+
+
+def upload_key(file_bytes: bytes) -> str:
+    """Content address of an upload: the same file always maps to the same key."""
+    return hashlib.sha256(file_bytes).hexdigest()
+
+
+class UploadCache:
+    """
+    Cache of processed uploads in a MongoDB collection, keyed by the SHA-256 of
+    the file bytes. An entry can hold the extracted text, the summary brief and
+    the chunk embeddings; each is stored as soon as it is computed. The
+    collection is kept under `max_bytes` by evicting least recently used entries;
+    puts keep a running size estimate and the collection is only recounted when
+    that estimate goes over the limit. `collection_factory` returns the
+    collection, or None while MongoDB is unavailable; every lookup is then a miss
+    and puts are skipped.
+    """
+
+    def __init__(self, collection_factory, max_bytes: int):
+        self._collection_factory = collection_factory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._estimated_bytes = None  # running total since the last recount; None until the first put
+        self._evicting = False
+        self._metrics = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def _record(self, key: str, value: int = 1):
+        with self._lock:
+            self._metrics[key] += value
+
+    def get(self, key: str, field: str):
+        """Return one cached field ("text", "summary" or "chunks") for an upload, or None."""
+        collection = self._collection_factory()
+        if collection is None:
+            self._record("misses")
+            return None
+        doc = collection.find_one_and_update(
+            {"_id": key, field: {"$exists": True}},
+            {"$set": {"last_hit": datetime.now()}},
+            projection={field: 1, "summary_model": 1, "embedding_model": 1},
+        )
+        # Summaries and embeddings made by another model are not reused
+        if doc is not None and field == "summary" and doc.get("summary_model") != settings.model_name:
+            doc = None
+        if doc is not None and field == "chunks" and doc.get("embedding_model") != embedding_model_id():
+            doc = None
+        self._record("hits" if doc is not None else "misses")
+        return doc[field] if doc is not None else None
+
+    def get_text(self, key: str) -> str | None:
+        return self.get(key, "text")
+
+    def get_summary(self, key: str) -> str | None:
+        return self.get(key, "summary")
+
+    def get_chunks(self, key: str) -> list[dict] | None:
+        """Cached [{"text", "vector"}] chunks of an upload for the current embedding backend."""
+        return self.get(key, "chunks")
+
+    def put(self, key: str, **fields):
+        """Merge fields into an upload's entry and evict old entries if the cache is over its size limit."""
+        collection = self._collection_factory()
+        if collection is None:
+            return
+        now = datetime.now()
+        # Per-field sizes make a repeated put of the same field overwrite its size instead of adding to it
+        sizes = {f"sizes.{name}": len(bson.encode({name: value})) for name, value in fields.items()}
+        collection.update_one(
+            {"_id": key},
+            {"$set": {**fields, **sizes, "last_hit": now}, "$setOnInsert": {"created_at": now}},
+            upsert=True,
+        )
+        with self._lock:
+            if self._estimated_bytes is None:
+                self._estimated_bytes = 0
+                recount = True
+            else:
+                self._estimated_bytes += sum(sizes.values())
+                recount = self._estimated_bytes > self.max_bytes and not self._evicting
+            self._evicting = self._evicting or recount
+        if recount:
+            try:
+                self._evict(collection)
+            finally:
+                with self._lock:
+                    self._evicting = False
+
+    def put_text(self, key: str, text: str):
+        self.put(key, text=text)
+
+    def put_summary(self, key: str, summary: str):
+        self.put(key, summary=summary, summary_model=settings.model_name)
+
+    def put_chunks(self, key: str, texts: list[str], vectors: list[list[float]], embedding_model: str):
+        chunks = [{"text": text, "vector": [float(x) for x in vector]} for text, vector in zip(texts, vectors)]
+        self.put(key, chunks=chunks, embedding_model=embedding_model)
+
+    def total_bytes(self, collection=None) -> int:
+        collection = collection if collection is not None else self._collection_factory()
+        if collection is None:
+            return 0
+        size = {"$add": [{"$ifNull": [f"$sizes.{field}", 0]} for field in ("text", "summary", "chunks")]}
+        result = list(collection.aggregate([{"$group": {"_id": None, "total": {"$sum": size}}}]))
+        return result[0]["total"] if result else 0
+
+    def _evict(self, collection):
+        """Recount the collection and, when it is over max_bytes, drop least recently used entries down to 90% of it."""
+        total = self.total_bytes(collection)
+        excess = total - int(self.max_bytes * 0.9) if total > self.max_bytes else 0
+        stale = []
+        for doc in collection.find({}, {"sizes": 1}).sort("last_hit", 1):
+            if excess <= 0:
+                break
+            size = sum((doc.get("sizes") or {}).values())
+            stale.append(doc["_id"])
+            excess -= size
+            total -= size
+        if stale:
+            collection.delete_many({"_id": {"$in": stale}})
+            self._record("evictions", len(stale))
+        with self._lock:
+            self._estimated_bytes = total
+
+    def metrics(self) -> dict:
+        with self._lock:
+            metrics = dict(self._metrics)
+        lookups = metrics["hits"] + metrics["misses"]
+        metrics["hit_rate"] = metrics["hits"] / lookups if lookups else 0.0
+        return metrics
+
+
+def build_upload_cache():
+    """Create the upload cache, or None when it is disabled."""
+    if settings.upload_cache_max_mb <= 0:
+        return None
+    from database.connection import get_collection
+    return UploadCache(
+        lambda: get_collection(settings.upload_cache_collection),
+        max_bytes=settings.upload_cache_max_mb * 1024 * 1024,
+    )
+
+
+upload_cache = build_upload_cache()
@@ -0,0 +1,129 @@
+import threading
+import time
+from collections import OrderedDict
+
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+from documents.upload_cache import upload_cache
+from src.config import settings
+from tools.chunking import split_documents
+from tools.embeddings import embedding_model_id, get_embeddings
+
+
+def estimate_index_bytes(vectorstore) -> int:
+    """Vectors plus chunk text held by a per-user upload index."""
+    size = vectorstore.index.ntotal * vectorstore.index.d * 4
+    for doc_id in vectorstore.index_to_docstore_id.values():
+        size += len(vectorstore.docstore.search(doc_id).page_content)
+    return size
+
+
+class UploadIndexStore:
+    """
+    Small in-memory FAISS index per user holding the chunks of the documents they
+    uploaded, so follow-up questions retrieve only the relevant parts. Indexes
+    expire `ttl_seconds` after their last use and are evicted least recently used
+    first while their estimated total size is over `max_memory_bytes`.
+    """
+
+    def __init__(self, ttl_seconds: float, max_memory_bytes: int, embeddings_factory=get_embeddings):
+        self.ttl_seconds = ttl_seconds
+        self.max_memory_bytes = max_memory_bytes
+        self._embeddings_factory = embeddings_factory
+        self._indexes = OrderedDict()  # username -> [vectorstore, document keys, size, last_used]
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def _chunks(self, text: str, name: str, document_key: str = None) -> tuple[list[str], list]:
+        """Chunk texts and vectors for a document, reusing embeddings from the upload cache."""
+        cached = upload_cache.get_chunks(document_key) if document_key and upload_cache is not None else None
+        if cached:
+            return [chunk["text"] for chunk in cached], [chunk["vector"] for chunk in cached]
+
+        texts = [chunk.page_content for chunk in split_documents([Document(page_content=text, metadata={"source": name})])]
+        vectors = self._embeddings_factory().embed_documents(texts)
+        if document_key and upload_cache is not None and texts:
+            upload_cache.put_chunks(document_key, texts, vectors, embedding_model_id())
+        return texts, vectors
+
+    def add_document(self, username: str, text: str, name: str = "uploaded document", document_key: str = None) -> int:
+        """Index a document for a user; returns the number of chunks added (0 if it was already indexed)."""
+        with self._lock:
+            entry = self._indexes.get(username)
+            if entry is not None and document_key and document_key in entry[1]:
+                entry[3] = time.monotonic()
+                return 0
+
+        texts, vectors = self._chunks(text, name, document_key)
+        if not texts:
+            return 0
+        metadatas = [{"source": name, "chunk": number} for number in range(len(texts))]
+
+        with self._lock:
+            now = time.monotonic()
+            entry = self._indexes.get(username)
+            if entry is None or now - entry[3] > self.ttl_seconds:
+                vectorstore = FAISS.from_embeddings(list(zip(texts, vectors)), self._embeddings_factory(), metadatas)
+                entry = [vectorstore, set(), 0, now]
+                self._indexes[username] = entry
+            else:
+                entry[0].add_embeddings(list(zip(texts, vectors)), metadatas)
+            if document_key:
+                entry[1].add(document_key)
+            entry[2] = estimate_index_bytes(entry[0])
+            entry[3] = now
+            self._indexes.move_to_end(username)
+            self._evict(now)
+        return len(texts)
+
+    def search(self, username: str, query: str, k: int) -> list | None:
+        """Most relevant chunks of the user's uploads, or None if they have no live index."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._indexes.get(username)
+            if entry is None or now - entry[3] > self.ttl_seconds:
+                return None
+            entry[3] = now
+            self._indexes.move_to_end(username)
+            vectorstore = entry[0]
+        return vectorstore.similarity_search(query, k=k)
+
+    def has_documents(self, username: str) -> bool:
+        with self._lock:
+            entry = self._indexes.get(username)
+            return entry is not None and time.monotonic() - entry[3] <= self.ttl_seconds
+
+    def drop(self, username: str):
+        """Forget a user's uploaded documents (e.g. on logout or 'New Chat')."""
+        with self._lock:
+            self._indexes.pop(username, None)
+
+    def evict_expired(self):
+        with self._lock:
+            self._evict(time.monotonic())
+
+    def _evict(self, now: float):
+        for username, entry in list(self._indexes.items()):
+            if now - entry[3] > self.ttl_seconds:
+                del self._indexes[username]
+                self.evictions += 1
+
+        total = sum(entry[2] for entry in self._indexes.values())
+        while total > self.max_memory_bytes and len(self._indexes) > 1:
+            _, entry = self._indexes.popitem(last=False)
+            total -= entry[2]
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "users": len(self._indexes),
+                "evictions": self.evictions,
+                "memory_bytes": sum(entry[2] for entry in self._indexes.values()),
+            }
+
+
+upload_index_store = UploadIndexStore(
+    ttl_seconds=settings.upload_index_ttl_seconds,
+    max_memory_bytes=settings.upload_index_max_memory_mb * 1024 * 1024,
+)
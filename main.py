@@ -1,5 +1,18 @@
 from agent.build_agent import build_career_agent
+from agent.response_cache import response_cache
+from agent.sessions import session_manager
+import asyncio
 import logging
+import time
+from documents.summarization import summarize_document
+from documents.upload_cache import upload_cache
+from documents.upload_index import upload_index_store
+from src.config import settings
+from src.event_loop import get_background_loop
+from memory.summary_memory import load_conversation_summary
+from memory.user_profile import get_user_profile
+from tools.career_tools import warm_up_career_docs
+from tools.profile_tools import active_username
 from database.logger import (
     log_chat, get_chat_history, is_first_time_user, clear_chat_history,
     update_user_last_activity
@@ -7,75 +20,269 @@ from database.logger import (
 
 logger = logging.getLogger(__name__)
 
-# Create agent only once to avoid reinitializing
-agent = build_career_agent()
+# Build the document index in the background instead of at import time
+warm_up_career_docs()
 
-async def handle_user_input_async(user_id: str, user_input: str, username: str = None, document_text: str = None) -> str:
+async def sweep_idle_state():
+    """Free expired agent sessions and upload indexes periodically, not only when a new one is added."""
+    while True:
+        await asyncio.sleep(settings.idle_sweep_interval_seconds)
+        try:
+            await asyncio.to_thread(session_manager.evict_expired)
+            await asyncio.to_thread(upload_index_store.evict_expired)
+            logger.info(f"Idle sweep: sessions {session_manager.stats()}, upload indexes {upload_index_store.stats()}")
+        except Exception as e:
+            logger.warning(f"Idle sweep failed: {e}")
+
+asyncio.run_coroutine_threadsafe(sweep_idle_state(), get_background_loop())
+
+FINAL_ANSWER_MARKER = "Final Answer:"
+EMPTY_RESPONSE = "I apologize, but I couldn't generate a proper response. Please try rephrasing your question."
+DOCUMENT_NEXT_STEPS = "\n\n💡 **Next Steps:** Feel free to ask me specific questions about the document, request improvements, or explore related career topics!"
+ERROR_RESPONSE = "⚠️ I encountered an unexpected error. Please try again or contact support if the issue persists."
+
+def extract_response_text(response_data) -> str:
+    """Pull the answer text out of whatever the agent returned."""
+    if isinstance(response_data, dict):
+        response = (
+            response_data.get("output") or 
+            response_data.get("result") or 
+            response_data.get("response") or
+            str(response_data)
+        )
+    else:
+        response = str(response_data)
+    
+    if not response or not response.strip():
+        response = EMPTY_RESPONSE
+    return response
+
+async def has_conversation_context(user_id: str, username: str = None) -> bool:
+    """True when an answer could depend on this user's session memory, stored summary or uploaded documents."""
+    if upload_index_store.has_documents(username or user_id):
+        return True
+    agent = session_manager.find_agent(user_id)
+    if agent is None:
+        # A returning user without a live session still has their stored summary
+        return bool(await asyncio.to_thread(load_conversation_summary, user_id))
+    memory = agent.memory
+    if memory is None:
+        return False
+    if hasattr(memory, "await_persisted_summary"):
+        await memory.await_persisted_summary()
+    return bool(memory.chat_memory.messages or getattr(memory, "moving_summary_buffer", ""))
+
+async def lookup_cached_response(user_id: str, username: str, user_input: str):
     """
-    Enhanced async version of handle_user_input with document processing support.
-    Added username parameter for user activity tracking and document_text for file analysis.
+    Return (cached answer or None, profile). Users with conversation context are never
+    served from the cache, and a failing lookup counts as a miss. On a hit the turn is
+    still added to the user's conversation memory so follow-up questions keep their context.
+    Together with storing only tool-free answers, this limits hits to tool-free first
+    turns (see benchmarks/response_cache_hits.py for the resulting hit rate).
     """
+    if response_cache is None:
+        return None, None
+    try:
+        if await has_conversation_context(user_id, username):
+            return None, None
+        profile = await asyncio.to_thread(get_user_profile, username or user_id)
+        cached = await asyncio.to_thread(response_cache.lookup, user_input, profile)
+    except Exception as e:
+        logger.warning(f"Response cache lookup failed: {e}")
+        return None, None
+    if cached is not None:
+        memory = session_manager.get_agent(user_id).memory
+        if memory is not None:
+            memory.chat_memory.add_user_message(user_input)
+            memory.chat_memory.add_ai_message(cached)
+    return cached, profile
+
+async def store_cached_response(user_input: str, profile, response: str, started: float):
+    if response_cache is None or profile is None or response in (EMPTY_RESPONSE, ERROR_RESPONSE):
+        return
+    try:
+        await asyncio.to_thread(response_cache.store, user_input, profile, response, time.perf_counter() - started)
+    except Exception as e:
+        logger.warning(f"Failed to cache response: {e}")
+
+async def document_brief(document_text: str, document_key: str = None) -> str:
+    """Map-reduce brief of an uploaded document, reused from the upload cache when the same file was seen before."""
+    if document_key and upload_cache is not None:
+        try:
+            cached = await asyncio.to_thread(upload_cache.get_summary, document_key)
+            if cached is not None:
+                return cached
+        except Exception as e:
+            logger.warning(f"Upload cache lookup failed: {e}")
+    try:
+        brief, _ = await summarize_document(document_text)
+    except Exception as e:
+        # Fall back to the start of the document rather than failing the request
+        logger.warning(f"Document summarization failed, using the first chunk instead: {e}")
+        return document_text[:settings.summary_chunk_tokens * 4]
+    if document_key and upload_cache is not None:
+        try:
+            await asyncio.to_thread(upload_cache.put_summary, document_key, brief)
+        except Exception as e:
+            logger.warning(f"Failed to cache document summary: {e}")
+    return brief
+
+async def index_upload(username: str, document_text: str, document_key: str = None, document_name: str = None):
+    """Add the document to the user's upload index so follow-up questions can search it."""
+    try:
+        await asyncio.to_thread(
+            upload_index_store.add_document, username, document_text,
+            name=document_name or "uploaded document", document_key=document_key
+        )
+    except Exception as e:
+        logger.warning(f"Failed to index uploaded document for {username}: {e}")
+
+async def document_prompt(user_input: str, document_text: str, document_key: str = None, username: str = None,
+                          document_name: str = None) -> str:
+    """Agent input for a question about an uploaded document, using a brief of it. The
+    document is indexed for the user's later questions while the brief is generated."""
+    brief, _ = await asyncio.gather(
+        document_brief(document_text, document_key),
+        index_upload(username, document_text, document_key, document_name),
+    )
+    return f"Please analyze this document and provide career advice based on its content:\n\n{brief}\n\nUser Question: {user_input}"
+
+def validate_input(user_id: str, user_input: str) -> str | None:
+    """Message to show instead of an answer when the request is unusable, else None."""
     if not user_id or not user_id.strip():
         return "⚠️ Error: User ID is required"
-    
     if not user_input or not user_input.strip():
         return "⚠️ Please provide a valid input message"
-    
+    return None
+
+async def prepare_input(user_id: str, user_input: str, username: str = None, document_text: str = None,
+                        document_key: str = None, document_name: str = None) -> str:
+    """Turn a validated message into the agent input and record the user's activity."""
     user_input = user_input.strip()
-    
-    # If document text is provided, prepend it to the user input
+
+    # If document text is provided, prepend a summary of it to the user input
     if document_text:
-        user_input = f"Please analyze this document and provide career advice based on its content:\n\n{document_text}\n\nUser Question: {user_input}"
-    
+        user_input = await document_prompt(user_input, document_text, document_key, username or user_id, document_name)
+
+    # Profile tools resolve the user from this context, not from Streamlit state
+    active_username.set(username or user_id)
+
+    # Blocking Mongo calls run in the default executor so the event loop stays free
+    if username:
+        await asyncio.to_thread(update_user_last_activity, username)
+
+    # Handle voice input processing
+    if user_input.lower().startswith("voice input:"):
+        user_input = user_input[12:].strip()  # Remove "voice input:" prefix
+    return user_input
+
+async def finish_turn(user_id: str, user_input: str, response: str, profile=None, started: float = None,
+                      document_text: str = None) -> str:
+    """Cache and log an answer, then return it cleaned up for display."""
+    # The turn is in the user's memory now; keep the session size estimate current
+    session_manager.update_size(user_id)
+    if started is not None:
+        await store_cached_response(user_input, profile, response, started)
+    await asyncio.to_thread(log_chat, user_id, user_input, response)
+    logger.info(f"Successfully processed request for user {user_id}")
+
+    response = response.strip()
+    # Add helpful suggestions for document analysis if applicable
+    if document_text:
+        response += DOCUMENT_NEXT_STEPS
+    return response
+
+async def handle_user_input_async(user_id: str, user_input: str, username: str = None, document_text: str = None,
+                                  document_key: str = None, document_name: str = None) -> str:
+    """
+    Enhanced async version of handle_user_input with document processing support.
+    Added username parameter for user activity tracking and document_text for file analysis.
+    Runs stream_user_input_async and returns only its final text.
+    """
+    response = ERROR_RESPONSE
+    async for event in stream_user_input_async(user_id, user_input, username, document_text, document_key,
+                                                     document_name):
+        if event["type"] == "final":
+            response = event["text"]
+    return response
+
+async def stream_user_input_async(user_id: str, user_input: str, username: str = None, document_text: str = None,
+                                  document_key: str = None, document_name: str = None):
+    """
+    Yields event dicts as the agent runs:
+      {"type": "tool_start", "tool": name}  /  {"type": "tool_end", "tool": name}
+      {"type": "token", "text": chunk}       (final-answer text only, as it is generated)
+      {"type": "final", "text": response}    (always last; the complete, cleaned response)
+    """
+    error = validate_input(user_id, user_input)
+    if error:
+        yield {"type": "final", "text": error}
+        return
+
     try:
-        logger.info(f"Processing async request from user {user_id}: {user_input[:100]}...")
-        
-        # Update user activity if username provided
-        if username:
-            update_user_last_activity(username)
-        
-        # Handle voice input processing
-        if user_input.lower().startswith("voice input:"):
-            user_input = user_input[12:].strip()  # Remove "voice input:" prefix
-        
-        response_data = agent.invoke({"input": user_input})
-        
-        if isinstance(response_data, dict):
-            response = (
-                response_data.get("output") or 
-                response_data.get("result") or 
-                response_data.get("response") or
-                str(response_data)
-            )
-        else:
-            response = str(response_data)
-        
-        if not response or not response.strip():
-            response = "I apologize, but I couldn't generate a proper response. Please try rephrasing your question."
-        
-        # Log successful interaction
-        log_chat(user_id, user_input, response)
-        logger.info(f"Successfully processed async request for user {user_id}")
-        
-        # Clean up response formatting
-        response = response.strip()
-        
-        # Add helpful suggestions for document analysis if applicable
-        if document_text:
-            response += "\n\n💡 **Next Steps:** Feel free to ask me specific questions about the document, request improvements, or explore related career topics!"
-        
-        return response
-        
+        user_input = await prepare_input(user_id, user_input, username, document_text, document_key, document_name)
+        logger.info(f"Processing request from user {user_id}: {user_input[:100]}...")
+
+        # Repeated questions are answered from the response cache (documents never are)
+        started = time.perf_counter()
+        cached, profile = (None, None) if document_text else await lookup_cached_response(user_id, username, user_input)
+        if cached is not None:
+            yield {"type": "final", "text": await finish_turn(user_id, user_input, cached)}
+            return
+
+        # Each user gets their own conversation memory; LLM and tools are shared
+        agent = session_manager.get_agent(user_id)
+        root_run_id = None
+        response_data = None
+        tools_running = 0
+        tools_used = False
+        # Text generated so far per LLM call, and whether its final answer has started
+        llm_text = {}
+        streaming_runs = set()
+
+        async for event in agent.astream_events({"input": user_input}, version="v1"):
+            kind = event["event"]
+            if root_run_id is None:
+                root_run_id = event["run_id"]
+
+            if kind == "on_tool_start":
+                tools_running += 1
+                tools_used = True
+                yield {"type": "tool_start", "tool": event["name"]}
+            elif kind == "on_tool_end":
+                tools_running = max(0, tools_running - 1)
+                yield {"type": "tool_end", "tool": event["name"]}
+            elif kind == "on_chat_model_stream" and tools_running == 0:
+                # Agent reasoning (Thought/Action) is not shown; stream only the final answer
+                run_id = event["run_id"]
+                chunk = event["data"]["chunk"].content
+                if not isinstance(chunk, str) or not chunk:
+                    continue
+                if run_id in streaming_runs:
+                    yield {"type": "token", "text": chunk}
+                    continue
+                text = llm_text.get(run_id, "") + chunk
+                llm_text[run_id] = text
+                if FINAL_ANSWER_MARKER in text:
+                    streaming_runs.add(run_id)
+                    answer_start = text.split(FINAL_ANSWER_MARKER, 1)[1].lstrip()
+                    if answer_start:
+                        yield {"type": "token", "text": answer_start}
+            elif kind == "on_chain_end" and event["run_id"] == root_run_id:
+                response_data = event["data"].get("output")
+
+        response = extract_response_text(response_data)
+        # Answers built from tool output (profile, documents, search) are specific to this user
+        cache_profile = None if tools_used else profile
+        yield {"type": "final", "text": await finish_turn(user_id, user_input, response, cache_profile, started, document_text)}
+
     except Exception as e:
-        logger.error(f"Unexpected error in async handler for user {user_id}: {str(e)}", exc_info=True)
-        error_msg = "⚠️ I encountered an unexpected error. Please try again or contact support if the issue persists."
-        
+        logger.error(f"Unexpected error in handler for user {user_id}: {str(e)}", exc_info=True)
         try:
-            log_chat(user_id, user_input, error_msg)
+            await asyncio.to_thread(log_chat, user_id, user_input, ERROR_RESPONSE)
         except Exception as log_error:
             logger.error(f"Failed to log error interaction: {str(log_error)}")
-        
-        return error_msg
+        yield {"type": "final", "text": ERROR_RESPONSE}
 
 def show_history(user_id: str):
     """Show chat history for CLI interface"""
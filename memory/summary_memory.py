@@ -1,12 +1,168 @@
+import asyncio
+import logging
+import threading
+from datetime import datetime
+
 from langchain.memory import ConversationSummaryBufferMemory
-from langchain_google_genai import ChatGoogleGenerativeAI
+from langchain.memory.chat_memory import BaseChatMemory
+from langchain_core.pydantic_v1 import PrivateAttr
+from database.connection import get_collection
 from src.config import settings
+from src.event_loop import get_background_loop
+from src.llm import get_chat_llm
+from tools.chunking import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+
+def _summaries():
+    return get_collection(settings.conversation_summary_collection)
+
+
+def load_conversation_summary(user_id: str) -> str:
+    collection = _summaries()
+    doc = collection.find_one({"_id": user_id}) if collection is not None else None
+    return (doc or {}).get("summary", "")
+
+
+def save_conversation_summary(user_id: str, summary: str):
+    collection = _summaries()
+    if collection is not None:
+        collection.update_one(
+            {"_id": user_id}, {"$set": {"summary": summary, "updated_at": datetime.now()}}, upsert=True
+        )
+
+
+def clear_conversation_summary(user_id: str):
+    """Forget a user's persisted summary (e.g. on 'New Chat')."""
+    collection = _summaries()
+    if collection is not None:
+        collection.delete_one({"_id": user_id})
+
+
+class BackgroundSummaryMemory(ConversationSummaryBufferMemory):
+    """
+    ConversationSummaryBufferMemory that never calls the LLM inside a turn.
+    Saving a turn only appends its messages; when the buffer is over
+    max_token_limit, a task on the background event loop summarizes the oldest
+    messages and then swaps in the new summary and drops exactly those messages.
+    Until it finishes, turns see the previous summary and the full buffer.
+    With a user_id the summary is loaded from and saved to MongoDB.
+    """
+
+    user_id: str | None = None
+    _task = PrivateAttr(default=None)
+    _lock = PrivateAttr(default_factory=threading.Lock)
+    _discarded = PrivateAttr(default=False)
+    _load_task = PrivateAttr(default=None)
+
+    def _buffer_tokens(self, messages) -> int:
+        # Local estimate; the model's token counter is a network call for Gemini
+        return sum(estimate_tokens(str(message.content)) for message in messages)
+
+    def _prune_count(self, messages) -> int:
+        """How many of the oldest messages must go for the rest to fit max_token_limit."""
+        remaining = self._buffer_tokens(messages)
+        count = 0
+        while remaining > self.max_token_limit and count < len(messages):
+            remaining -= estimate_tokens(str(messages[count].content))
+            count += 1
+        return count
+
+    def save_context(self, inputs, outputs) -> None:
+        BaseChatMemory.save_context(self, inputs, outputs)
+        self.prune()
+
+    async def asave_context(self, inputs, outputs) -> None:
+        await BaseChatMemory.asave_context(self, inputs, outputs)
+        self.prune()
+
+    def prune(self) -> None:
+        """Start background summarization if the buffer is over the limit; returns immediately."""
+        if self._buffer_tokens(self.chat_memory.messages) <= self.max_token_limit:
+            return
+        with self._lock:
+            if self._task is not None and not self._task.done():
+                return  # the running task re-checks the buffer before it finishes
+            self._task = asyncio.run_coroutine_threadsafe(self._summarize(), get_background_loop())
+
+    async def aprune(self) -> None:
+        self.prune()
+
+    async def _summarize(self):
+        try:
+            while True:
+                messages = list(self.chat_memory.messages)
+                count = self._prune_count(messages)
+                if count == 0:
+                    return
+                summary = await self.apredict_new_summary(messages[:count], self.moving_summary_buffer)
+                with self._lock:
+                    if self._discarded:
+                        return
+                    current = self.chat_memory.messages
+                    # Turns are only ever appended; anything else (clear) makes this summary stale
+                    if len(current) < count or any(a is not b for a, b in zip(current, messages[:count])):
+                        return
+                    del current[:count]
+                    self.moving_summary_buffer = summary
+                if self.user_id:
+                    await asyncio.to_thread(self._save_summary, summary)
+        except Exception as e:
+            logger.warning(f"Background conversation summary failed for {self.user_id}: {e}")
+
+    def _save_summary(self, summary: str):
+        # Under the lock so discard() returns either before this save starts or after it is done
+        with self._lock:
+            if not self._discarded:
+                save_conversation_summary(self.user_id, summary)
+
+    def discard(self):
+        """
+        Stop background summarization for an ended conversation. After this returns
+        no summary of it is saved, so deleting the persisted summary is final.
+        """
+        with self._lock:
+            self._discarded = True
+            task = self._task
+        if task is not None:
+            task.cancel()
+
+    def load_persisted_summary(self):
+        """Fetch the user's saved summary in the background; used once it arrives if nothing newer exists."""
+        async def load():
+            try:
+                summary = await asyncio.to_thread(load_conversation_summary, self.user_id)
+            except Exception as e:
+                logger.warning(f"Failed to load conversation summary for {self.user_id}: {e}")
+                return
+            with self._lock:
+                if summary and not self.moving_summary_buffer and not self._discarded:
+                    self.moving_summary_buffer = summary
+
+        if self.user_id:
+            self._load_task = asyncio.run_coroutine_threadsafe(load(), get_background_loop())
+
+    async def await_persisted_summary(self):
+        """Wait (from the background loop) until the saved summary has been loaded, if one is being loaded."""
+        if self._load_task is not None:
+            await asyncio.wrap_future(self._load_task)
+
+    def wait_for_summary(self, timeout: float = None):
+        """Block until a running background summarization has finished (for shutdown and scripts)."""
+        task = self._task
+        if task is not None:
+            task.result(timeout)
+
 
-def get_summary_memory():
-    summary_llm = ChatGoogleGenerativeAI(temperature=0, model=settings.model_name, google_api_key=settings.google_api_key)
-    return ConversationSummaryBufferMemory(
+def get_summary_memory(user_id: str = None):
+    summary_llm = get_chat_llm(temperature=0)
+    memory = BackgroundSummaryMemory(
         llm=summary_llm,
         max_token_limit=settings.max_token_limit,
         memory_key="chat_history",
-        return_messages=True
+        return_messages=True,
+        user_id=user_id
     )
+    memory.load_persisted_summary()
+    return memory
@@ -1,23 +1,89 @@
-from pymongo import MongoClient
+import logging
+import threading
+import time
+from pymongo import ReturnDocument
 from src.config import settings
+from database.connection import get_collection
+
+logger = logging.getLogger(__name__)
+
+# Every write bumps this field; it orders cache entries and is hidden from callers
+VERSION_FIELD = "_version"
+PROFILE_PROJECTION = {"_id": 0, "username": 0}
+
+# Per-process profile cache: username -> (profile, version, expires_at)
+_cache = {}
+_cache_lock = threading.Lock()
+_listener_started = False
+
+
+def _profiles():
+    return get_collection("user_profiles", settings.user_profiles_collection)
+
+
+def _store(username: str, doc: dict):
+    """Cache a profile document unless a newer version is already cached."""
+    doc = dict(doc or {})
+    version = doc.pop(VERSION_FIELD, 0)
+    with _cache_lock:
+        cached = _cache.get(username)
+        if cached is not None and cached[1] > version:
+            return
+        _cache[username] = (doc, version, time.monotonic() + settings.profile_cache_ttl_seconds)
+        if len(_cache) > settings.profile_cache_max_entries:
+            # Drop the entry closest to expiry
+            oldest = min(_cache, key=lambda name: _cache[name][2])
+            del _cache[oldest]
+
+
+def invalidate_user_profile(username: str = None):
+    """Drop one user's cached profile, or every cached profile when no username is given."""
+    with _cache_lock:
+        if username is None:
+            _cache.clear()
+        else:
+            _cache.pop(username, None)
 
-client = MongoClient(settings.mongo_uri)
-db = client[settings.user_profiles_collection]
-profiles_col = db["user_profiles"]
 
 def get_user_profile(username: str) -> dict:
     """Return current user profile dictionary for a given username."""
-    profile = profiles_col.find_one({"username": username}, {"_id": 0, "username": 0})
-    return profile or {}
+    _ensure_change_listener()
+    with _cache_lock:
+        cached = _cache.get(username)
+    if cached is not None and cached[2] > time.monotonic():
+        return dict(cached[0])
 
-def update_user_profile(username: str, key: str, value: str) -> bool:
-    """Update or add a field in the user profile."""
-    result = profiles_col.update_one(
+    profiles_col = _profiles()
+    if profiles_col is None:
+        return {}
+    profile = profiles_col.find_one({"username": username}, PROFILE_PROJECTION)
+    _store(username, profile)
+    return {k: v for k, v in (profile or {}).items() if k != VERSION_FIELD}
+
+
+def update_user_profile_fields(username: str, fields: dict) -> bool:
+    """Set several profile fields in one atomic update, writing the result through to the cache."""
+    profiles_col = _profiles()
+    if not fields or profiles_col is None:
+        return False
+    profile = profiles_col.find_one_and_update(
         {"username": username},
-        {"$set": {key: value}},
-        upsert=True
+        {"$set": fields, "$inc": {VERSION_FIELD: 1}},
+        projection=PROFILE_PROJECTION,
+        upsert=True,
+        return_document=ReturnDocument.AFTER
     )
-    return result.acknowledged
+    if profile is None:
+        invalidate_user_profile(username)
+        return False
+    _store(username, profile)
+    return True
+
+
+def update_user_profile(username: str, key: str, value: str) -> bool:
+    """Update or add a field in the user profile."""
+    return update_user_profile_fields(username, {key: value})
+
 
 def profile_to_text(username: str) -> str:
     """Convert the profile dict to a text block for prompts."""
@@ -25,3 +91,34 @@ def profile_to_text(username: str) -> str:
     if not profile:
         return "No profile information collected yet."
     return "\n".join([f"{k.capitalize()}: {v}" for k, v in profile.items()])
+
+
+def _watch_profile_changes():
+    """Invalidate cached profiles when another worker changes them (needs a replica set)."""
+    profiles_col = _profiles()
+    if profiles_col is None:
+        logger.warning("MongoDB is unavailable, profile cache relies on TTL only")
+        return
+    try:
+        with profiles_col.watch(full_document="updateLookup") as stream:
+            for change in stream:
+                document = change.get("fullDocument") or {}
+                username = document.get("username")
+                if change["operationType"] in ("delete", "drop", "invalidate") or not username:
+                    invalidate_user_profile()
+                else:
+                    _store(username, {k: v for k, v in document.items() if k not in ("_id", "username")})
+    except Exception as e:
+        # Standalone servers do not support change streams; the TTL still bounds staleness
+        logger.warning(f"Profile change stream stopped, relying on TTL only: {e}")
+
+
+def _ensure_change_listener():
+    global _listener_started
+    if _listener_started or not settings.profile_cache_change_stream:
+        return
+    with _cache_lock:
+        if _listener_started:
+            return
+        _listener_started = True
+    threading.Thread(target=_watch_profile_changes, name="profile-change-stream", daemon=True).start()
@@ -9,15 +9,114 @@ class Settings(BaseSettings):
     temperature: float = Field(default=0.7)
     max_token_limit: int = Field(default=1000)
 
+    # Per-user agent sessions
+    agent_session_max: int = Field(default=5000)
+    agent_session_ttl_seconds: int = Field(default=1800)
+    agent_session_max_memory_mb: int = Field(default=256)
+    # How often expired sessions and upload indexes are freed when no request arrives
+    idle_sweep_interval_seconds: int = Field(default=300)
+    background_executor_workers: int = Field(default=32)
+    stream_responses: bool = Field(default=True)
+    chat_history_page_size: int = Field(default=50)
+    chat_render_window: int = Field(default=30)
+
+    # Response cache in front of the agent: "memory", "mongo" or "off". Only tool-free
+    # answers to first turns are shared, so hits stay low: about 16% of all turns when
+    # no question needs a tool, 1-2% when half do (benchmarks/response_cache_hits.py)
+    response_cache_backend: str = Field(default="memory")
+    response_cache_collection: str = Field(default="response_cache")
+    # Semantic matching embeds every cacheable query before the agent runs
+    response_cache_semantic: bool = Field(default=False)
+    response_cache_embed_timeout: float = Field(default=2.0)
+    response_cache_threshold: float = Field(default=0.92)
+    response_cache_ttl_seconds: int = Field(default=86400)
+    response_cache_max_entries: int = Field(default=10000)
+    response_cache_min_words: int = Field(default=3)
+    response_cache_profile_fields: list[str] = Field(default=["role", "location", "experience", "education", "industry"])
+
     # Mongo settings
     mongo_uri: str = Field(..., env="MONGO_URI")
+    mongo_max_pool_size: int = Field(default=50)
+    mongo_min_pool_size: int = Field(default=0)
+    mongo_max_idle_time_ms: int = Field(default=60000)
+    mongo_connect_timeout_ms: int = Field(default=5000)
+    mongo_server_selection_timeout_ms: int = Field(default=5000)
+    mongo_socket_timeout_ms: int = Field(default=20000)
+    mongo_wait_queue_timeout_ms: int = Field(default=5000)
+    mongo_offline_recheck_seconds: float = Field(default=30.0)
     mongo_db: str = Field(default="agentic_bot")
     mongo_collection: str = Field(default="chat_logs")
+
+    # Write-behind queue. "async": chat logs and activity updates are batched in
+    # the background; "sync": they are written on the request path
+    write_behind_mode: str = Field(default="async")
+    write_behind_flush_interval: float = Field(default=2.0)
+    write_behind_max_buffer: int = Field(default=1000)
     
     # User authentication collections
     users_collection: str = Field(default="users")
     chat_history_collection: str = Field(default="chat_history")
+    counters_collection: str = Field(default="counters")
+    conversation_summary_collection: str = Field(default="conversation_summaries")
     user_profiles_collection: str = Field(default="user_profiles")
+    profile_cache_ttl_seconds: int = Field(default=300)
+    profile_cache_max_entries: int = Field(default=10000)
+    # Invalidate cached profiles from a MongoDB change stream (replica sets only)
+    profile_cache_change_stream: bool = Field(default=False)
+
+    # Career document index
+    career_sources: list[str] = Field(default=["data/career_guides.txt", "data/career_reports.pdf"])
+    # "google" (Gemini API), or a CPU-only local backend: "hashing" or "sentence-transformers"
+    embedding_backend: str = Field(default="google")
+    embedding_model: str = Field(default="models/embedding-001")
+    local_embedding_model: str = Field(default="sentence-transformers/all-MiniLM-L6-v2")
+    hashing_embedding_dim: int = Field(default=1024)
+    embedding_batch_size: int = Field(default=64)
+    embedding_max_concurrency: int = Field(default=4)
+    embedding_max_retries: int = Field(default=5)
+    index_dir: str = Field(default="data/index")
+    # FAISS index type: "flat" (exact), "ivf", "ivfpq" (product-quantized IVF) or "hnsw"
+    index_type: str = Field(default="flat")
+    ivf_nlist: int = Field(default=0)  # 0 picks about 4 * sqrt(vectors)
+    ivf_nprobe: int = Field(default=8)
+    pq_m: int = Field(default=16)
+    pq_nbits: int = Field(default=8)
+    hnsw_m: int = Field(default=32)
+    hnsw_ef_construction: int = Field(default=80)
+    hnsw_ef_search: int = Field(default=64)
+    chunk_size: int = Field(default=300)  # estimated tokens
+    chunk_overlap: int = Field(default=40)
+    min_chunk_tokens: int = Field(default=20)
+    retriever_k: int = Field(default=4)
+    # "hybrid" fuses BM25 and FAISS rankings; "vector" and "bm25" use one of them
+    retrieval_mode: str = Field(default="hybrid")
+    hybrid_candidates: int = Field(default=20)
+    rrf_k: int = Field(default=60)
+    # "off", "coverage" (query-term coverage) or "cross-encoder" (needs sentence-transformers)
+    reranker: str = Field(default="off")
+    reranker_model: str = Field(default="cross-encoder/ms-marco-MiniLM-L-6-v2")
+    retrieval_cache_max_entries: int = Field(default=5000)
+    retrieval_cache_ttl_seconds: int = Field(default=86400)
+
+    # Uploaded documents
+    upload_max_tokens: int = Field(default=12000)  # extraction stops here
+    # Pages the budget must still need before the process pool is worth its startup cost
+    pdf_parallel_min_pages: int = Field(default=500)
+    pdf_pages_per_task: int = Field(default=16)
+    extraction_workers: int = Field(default=4)
+    # Map-reduce summarization of uploads (sizes in estimated tokens)
+    summary_chunk_tokens: int = Field(default=2000)
+    summary_reduce_tokens: int = Field(default=3000)
+    summary_brief_tokens: int = Field(default=600)
+    summary_max_concurrency: int = Field(default=4)
+    summary_call_timeout: float = Field(default=60.0)
+    # Processed uploads keyed by SHA-256 of the file; 0 disables the cache
+    upload_cache_collection: str = Field(default="upload_cache")
+    upload_cache_max_mb: int = Field(default=256)
+    # Per-user in-memory index of uploaded documents for follow-up questions
+    upload_index_ttl_seconds: int = Field(default=3600)
+    upload_index_max_memory_mb: int = Field(default=256)
+    upload_index_k: int = Field(default=4)
 
     class Config:
         env_file = ".env"  
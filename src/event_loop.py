@@ -0,0 +1,67 @@
+import asyncio
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from src.config import settings
+
+_loop = None
+_lock = threading.Lock()
+
+
+def _run_loop(loop: asyncio.AbstractEventLoop):
+    asyncio.set_event_loop(loop)
+    loop.run_forever()
+
+
+def get_background_loop() -> asyncio.AbstractEventLoop:
+    """
+    Return the process-wide event loop, starting its daemon thread on first use.
+    Async clients created on this loop (LLM HTTP sessions, etc.) stay bound to it
+    and are reused across calls instead of dying with a per-call loop.
+    """
+    global _loop
+    with _lock:
+        if _loop is None or _loop.is_closed():
+            _loop = asyncio.new_event_loop()
+            # Bounded pool for asyncio.to_thread offloads (Mongo writes, sync tools)
+            _loop.set_default_executor(ThreadPoolExecutor(
+                max_workers=settings.background_executor_workers,
+                thread_name_prefix="background-executor"
+            ))
+            threading.Thread(target=_run_loop, args=(_loop,), name="background-event-loop", daemon=True).start()
+        return _loop
+
+
+def run_coroutine(coro, timeout: float = None):
+    """Submit a coroutine to the background loop and block until it returns."""
+    future = asyncio.run_coroutine_threadsafe(coro, get_background_loop())
+    return future.result(timeout)
+
+
+_DONE = object()
+
+
+def iterate_async(agen, timeout: float = None):
+    """
+    Consume an async generator on the background loop from synchronous code,
+    yielding each item as soon as it is produced.
+    """
+    items = queue.Queue()
+
+    async def pump():
+        try:
+            async for item in agen:
+                items.put((item, None))
+        except BaseException as e:
+            items.put((_DONE, e))
+        else:
+            items.put((_DONE, None))
+
+    asyncio.run_coroutine_threadsafe(pump(), get_background_loop())
+    while True:
+        item, error = items.get(timeout=timeout)
+        if item is _DONE:
+            if error is not None:
+                raise error
+            return
+        yield item
@@ -0,0 +1,14 @@
+from functools import lru_cache
+from langchain_google_genai import ChatGoogleGenerativeAI
+from src.config import settings
+
+
+@lru_cache(maxsize=None)
+def get_chat_llm(temperature: float = None, convert_system_message_to_human: bool = False) -> ChatGoogleGenerativeAI:
+    """Return a shared Gemini chat client, created on first use for each configuration."""
+    return ChatGoogleGenerativeAI(
+        model=settings.model_name,
+        temperature=settings.temperature if temperature is None else temperature,
+        google_api_key=settings.google_api_key,
+        convert_system_message_to_human=convert_system_message_to_human
+    )
@@ -0,0 +1,113 @@
+import logging
+import math
+
+import faiss
+import numpy as np
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+# FAISS warns below this many training points per centroid
+POINTS_PER_CENTROID = 39
+
+
+def index_params() -> dict:
+    """Build-time ANN settings, recorded in the index manifest. Empty for the default exact index."""
+    index_type = settings.index_type
+    if index_type == "flat":
+        return {}
+    if index_type == "ivf":
+        return {"type": "ivf", "nlist": settings.ivf_nlist}
+    if index_type == "ivfpq":
+        return {"type": "ivfpq", "nlist": settings.ivf_nlist, "pq_m": settings.pq_m, "pq_nbits": settings.pq_nbits}
+    if index_type == "hnsw":
+        return {"type": "hnsw", "m": settings.hnsw_m, "ef_construction": settings.hnsw_ef_construction}
+    raise ValueError(f"Unknown index type '{index_type}'")
+
+
+def _nlist(params: dict, count: int) -> int:
+    requested = params.get("nlist") or int(4 * math.sqrt(count))
+    return max(1, min(requested, count // POINTS_PER_CENTROID))
+
+
+def build_index(vectors: np.ndarray, params: dict):
+    """
+    Create, train and fill a FAISS index of the type described by `params`.
+    IVF types fall back to an exact index when there are too few vectors to train on.
+    """
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    count, dim = vectors.shape
+    index_type = params.get("type", "flat")
+
+    if index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(dim, params["m"])
+        index.hnsw.efConstruction = params["ef_construction"]
+    elif index_type in ("ivf", "ivfpq"):
+        nlist = _nlist(params, count)
+        required = nlist * POINTS_PER_CENTROID
+        if index_type == "ivfpq":
+            if dim % params["pq_m"]:
+                raise ValueError(f"pq_m={params['pq_m']} must divide the embedding dimension {dim}")
+            required = max(required, 2 ** params["pq_nbits"])
+        if count < required:
+            logger.warning(f"{count} vectors are too few to train a {index_type} index, using an exact index")
+            index = faiss.IndexFlatL2(dim)
+        else:
+            quantizer = faiss.IndexFlatL2(dim)
+            if index_type == "ivf":
+                index = faiss.IndexIVFFlat(quantizer, dim, nlist)
+            else:
+                index = faiss.IndexIVFPQ(quantizer, dim, nlist, params["pq_m"], params["pq_nbits"])
+            index.train(vectors)
+    else:
+        index = faiss.IndexFlatL2(dim)
+
+    index.add(vectors)
+    apply_search_params(index)
+    return index
+
+
+def apply_search_params(index):
+    """Set query-time knobs (nprobe, efSearch), which are not part of the saved index."""
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        ivf.nprobe = settings.ivf_nprobe
+    if isinstance(index, faiss.IndexHNSW):
+        index.hnsw.efSearch = settings.hnsw_ef_search
+
+
+def convert_index(vectorstore, params: dict):
+    """Replace a freshly built exact index with the configured ANN index."""
+    if params and vectorstore.index.ntotal:
+        flat = vectorstore.index
+        vectorstore.index = build_index(flat.reconstruct_n(0, flat.ntotal), params)
+
+
+def delete_vectors(vectorstore, ids: list[str], params: dict):
+    """
+    Remove chunks by docstore ID. FAISS.delete is only correct for exact indexes:
+    IVF keeps the old positions after remove_ids and HNSW cannot remove at all,
+    so those are refilled from their own stored vectors (IVF keeps its training).
+    """
+    index = vectorstore.index
+    if isinstance(index, faiss.IndexFlat):
+        vectorstore.delete(ids)
+        return
+
+    removed = set(ids)
+    keep = [position for position, doc_id in sorted(vectorstore.index_to_docstore_id.items())
+            if doc_id not in removed]
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        ivf.make_direct_map()
+    vectors = index.reconstruct_n(0, index.ntotal)[keep]
+
+    if ivf is not None:
+        index.reset()
+        index.add(vectors)
+    else:
+        vectorstore.index = build_index(vectors, params)
+    vectorstore.docstore.delete(list(removed))
+    vectorstore.index_to_docstore_id = {
+        new: vectorstore.index_to_docstore_id[old] for new, old in enumerate(keep)
+    }
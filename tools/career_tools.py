@@ -1,10 +1,18 @@
+import asyncio
+import logging
+import threading
 from langchain.tools import Tool
 from src.config import settings
-from langchain_community.document_loaders import TextLoader, PyMuPDFLoader
-from langchain_community.vectorstores import FAISS
+from src.llm import get_chat_llm
 from langchain.chains import RetrievalQA
 from langchain.schema.document import Document
-from langchain_google_genai import ChatGoogleGenerativeAI, GoogleGenerativeAIEmbeddings
+from tools.embeddings import get_embeddings
+from tools.ingest import load_career_index
+from tools.hybrid_search import HybridSearcher, get_reranker
+from tools.retrieval_cache import RetrievalCache
+from tools.vector_index import load_manifest, manifest_version
+
+logger = logging.getLogger(__name__)
 
 # Salary Benchmark Tool
 def salary_tool_fn(query: str) -> str:
@@ -37,25 +45,116 @@ job_explainer_tool = Tool.from_function(
 )
 
 # Document Search Tool (RAG) using Gemini
-text_loader = TextLoader("data/career_guides.txt")
-pdf_loader = PyMuPDFLoader("data/career_reports.pdf")
-career_docs = text_loader.load() + pdf_loader.load()
-
-if career_docs:
-    embeddings = GoogleGenerativeAIEmbeddings(model="models/embedding-001", google_api_key=settings.google_api_key)
-    vectorstore = FAISS.from_documents(career_docs, embeddings)
-    qa_chain = RetrievalQA.from_chain_type(llm=ChatGoogleGenerativeAI(model=settings.model_name, temperature=0, google_api_key=settings.google_api_key),
-                                           retriever=vectorstore.as_retriever(),
-                                           return_source_documents=True)
-
-    rag_tool = Tool.from_function(
-        func=lambda q: qa_chain.invoke(q),
-        name="CareerDocSearcher",
-        description="Searches government career guides, HR reports, and industry docs to give informed answers."
+# The index and QA chain are built lazily (or by warm_up_career_docs in a
+# background thread) so importing this module never blocks on embeddings.
+WARMING_UP_MESSAGE = "The career document search is still warming up. Please answer from general knowledge for now."
+NO_DOCS_MESSAGE = "No career documents available right now."
+
+_qa_chain = None
+_searcher = None
+_rag_status = "cold"  # cold -> warming -> ready | unavailable | failed
+_rag_lock = threading.Lock()
+
+# Caches retrieved doc IDs per query and answers per (query, doc IDs); emptied
+# whenever a rebuilt index with a different manifest is loaded
+retrieval_cache = RetrievalCache(
+    max_entries=settings.retrieval_cache_max_entries,
+    ttl_seconds=settings.retrieval_cache_ttl_seconds,
+)
+
+
+def _build_qa_chain():
+    vectorstore = load_career_index(get_embeddings())
+    if vectorstore is None:
+        return None
+    retrieval_cache.set_version(manifest_version(load_manifest(settings.index_dir)))
+    return RetrievalQA.from_chain_type(llm=get_chat_llm(temperature=0),
+                                       retriever=vectorstore.as_retriever(search_kwargs={"k": settings.retriever_k}),
+                                       return_source_documents=True)
+
+
+def _build_searcher(vectorstore) -> HybridSearcher:
+    return HybridSearcher(
+        vectorstore,
+        mode=settings.retrieval_mode,
+        candidates=settings.hybrid_candidates,
+        rrf_k=settings.rrf_k,
+        reranker=get_reranker(settings.reranker, settings.reranker_model),
     )
-else:
-    rag_tool = Tool.from_function(
-        func=lambda _: "No career documents available right now.",
-        name="CareerDocSearcher",
-        description="(Temporarily disabled — no career documents found.)"
-    )
\ No newline at end of file
+
+
+def _warm_up():
+    global _qa_chain, _searcher, _rag_status
+    try:
+        _qa_chain = _build_qa_chain()
+        if _qa_chain is not None:
+            _searcher = _build_searcher(_qa_chain.retriever.vectorstore)
+        _rag_status = "ready" if _qa_chain is not None else "unavailable"
+    except Exception as e:
+        logger.error(f"Failed to build career document index: {e}", exc_info=True)
+        _rag_status = "failed"
+
+
+def warm_up_career_docs():
+    """Start building the document index in a background thread (once)."""
+    global _rag_status
+    with _rag_lock:
+        if _rag_status not in ("cold", "failed"):
+            return
+        _rag_status = "warming"
+    threading.Thread(target=_warm_up, name="career-docs-warmup", daemon=True).start()
+
+
+def career_docs_status() -> str:
+    return _rag_status
+
+
+def search_doc_ids(query: str) -> list[str]:
+    """Docstore IDs of the top-k chunks for a query, served from the cache when possible."""
+    doc_ids = retrieval_cache.get_doc_ids(query)
+    if doc_ids is None:
+        doc_ids = _searcher.search_ids(query, settings.retriever_k)
+        retrieval_cache.put_doc_ids(query, doc_ids)
+    return doc_ids
+
+
+def _documents(doc_ids: list[str]) -> list:
+    docstore = _qa_chain.retriever.vectorstore.docstore
+    return [docstore.search(doc_id) for doc_id in doc_ids]
+
+
+def _answer(query: str, doc_ids: list[str], answer: str) -> dict:
+    retrieval_cache.put_answer(query, doc_ids, answer)
+    return {"query": query, "result": answer, "source_documents": _documents(doc_ids)}
+
+
+def rag_tool_fn(query: str):
+    if _rag_status == "ready":
+        doc_ids = search_doc_ids(query)
+        answer = retrieval_cache.get_answer(query, doc_ids)
+        if answer is None:
+            output = _qa_chain.combine_documents_chain.invoke({"input_documents": _documents(doc_ids), "question": query})
+            answer = output["output_text"]
+        return _answer(query, doc_ids, answer)
+    if _rag_status == "unavailable":
+        return NO_DOCS_MESSAGE
+    warm_up_career_docs()
+    return WARMING_UP_MESSAGE
+
+async def arag_tool_fn(query: str):
+    if _rag_status == "ready":
+        # Embedding and FAISS search are blocking; keep them off the event loop
+        doc_ids = await asyncio.to_thread(search_doc_ids, query)
+        answer = retrieval_cache.get_answer(query, doc_ids)
+        if answer is None:
+            output = await _qa_chain.combine_documents_chain.ainvoke({"input_documents": _documents(doc_ids), "question": query})
+            answer = output["output_text"]
+        return _answer(query, doc_ids, answer)
+    return rag_tool_fn(query)
+
+rag_tool = Tool.from_function(
+    func=rag_tool_fn,
+    coroutine=arag_tool_fn,
+    name="CareerDocSearcher",
+    description="Searches government career guides, HR reports, and industry docs to give informed answers."
+)
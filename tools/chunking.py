@@ -0,0 +1,52 @@
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+from src.config import settings
+
+# Section boundaries tried before falling back to paragraphs, lines and words.
+# The first covers the markdown headings in career_guides.txt, the others the
+# numbered activity/step/section headings used in career_reports.pdf.
+SECTION_SEPARATORS = [
+    r"\n(?=#{1,6} )",
+    r"\n(?=(?:Activity|Step|Section|Part|Chapter) \d+(?:\.\d+)*\b)",
+    r"\n\n",
+    r"\n",
+    r"(?<=[.!?]) ",
+    r" ",
+    r"",
+]
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (about four characters per token for English text)."""
+    return (len(text) + 3) // 4
+
+
+def chunking_params() -> dict:
+    """The settings that determine chunk boundaries, recorded in the index manifest."""
+    return {
+        "chunk_size": settings.chunk_size,
+        "chunk_overlap": settings.chunk_overlap,
+        "min_chunk_tokens": settings.min_chunk_tokens,
+    }
+
+
+def get_text_splitter(chunk_size: int = None, chunk_overlap: int = None) -> RecursiveCharacterTextSplitter:
+    """Splitter measuring chunk_size and chunk_overlap in estimated tokens."""
+    return RecursiveCharacterTextSplitter(
+        separators=SECTION_SEPARATORS,
+        is_separator_regex=True,
+        keep_separator=True,
+        chunk_size=chunk_size or settings.chunk_size,
+        chunk_overlap=settings.chunk_overlap if chunk_overlap is None else chunk_overlap,
+        length_function=estimate_tokens,
+        strip_whitespace=True,
+    )
+
+
+def split_documents(documents: list, chunk_size: int = None, chunk_overlap: int = None, min_chunk_tokens: int = None) -> list:
+    """
+    Split loaded documents into retrieval-sized chunks, keeping each chunk's source
+    metadata. Chunks below `min_chunk_tokens` (page headers, blank pages) are dropped.
+    """
+    min_tokens = settings.min_chunk_tokens if min_chunk_tokens is None else min_chunk_tokens
+    chunks = get_text_splitter(chunk_size, chunk_overlap).split_documents(documents)
+    return [chunk for chunk in chunks if estimate_tokens(chunk.page_content) >= min_tokens]
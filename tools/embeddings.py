@@ -0,0 +1,199 @@
+import logging
+import random
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+import numpy as np
+from google.api_core.exceptions import ResourceExhausted, ServiceUnavailable, TooManyRequests
+from langchain_core.embeddings import Embeddings
+from langchain_google_genai import GoogleGenerativeAIEmbeddings
+from src.config import settings
+from tools.text import TOKEN_PATTERN
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_ERRORS = (ResourceExhausted, ServiceUnavailable, TooManyRequests)
+RETRYABLE_MESSAGES = ("429", "quota", "resource exhausted", "rate limit", "503")
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """True for quota / throttling errors, including ones wrapped by the client library."""
+    while error is not None:
+        if isinstance(error, RETRYABLE_ERRORS):
+            return True
+        message = str(error).lower()
+        if any(marker in message for marker in RETRYABLE_MESSAGES):
+            return True
+        error = error.__cause__
+    return False
+
+
+class BatchedEmbeddings(Embeddings):
+    """
+    Wraps another Embeddings client: splits documents into fixed-size batches,
+    embeds up to `max_concurrency` batches at once, and retries batches that hit
+    rate limits with exponential backoff and jitter. Output order matches input.
+    """
+
+    def __init__(self, inner: Embeddings, batch_size: int = 64, max_concurrency: int = 4,
+                 max_retries: int = 5, backoff_base: float = 1.0, backoff_max: float = 30.0):
+        self.inner = inner
+        self.batch_size = max(1, batch_size)
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._lock = threading.Lock()
+        self.reset_metrics()
+
+    def reset_metrics(self):
+        with self._lock:
+            self._metrics = {"texts": 0, "batches": 0, "retries": 0, "failures": 0, "seconds": 0.0}
+
+    def metrics(self) -> dict:
+        """Counters since the last reset, plus throughput in texts per second."""
+        with self._lock:
+            metrics = dict(self._metrics)
+        metrics["texts_per_second"] = metrics["texts"] / metrics["seconds"] if metrics["seconds"] else 0.0
+        return metrics
+
+    def _record(self, **counts):
+        with self._lock:
+            for key, value in counts.items():
+                self._metrics[key] += value
+
+    def _with_retries(self, fn, *args):
+        attempt = 0
+        while True:
+            try:
+                return fn(*args)
+            except Exception as e:
+                if attempt >= self.max_retries or not is_rate_limit_error(e):
+                    self._record(failures=1)
+                    raise
+                delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+                delay *= random.uniform(0.5, 1.0)
+                attempt += 1
+                self._record(retries=1)
+                logger.warning(f"Embedding rate limited, retry {attempt}/{self.max_retries} in {delay:.1f}s")
+                time.sleep(delay)
+
+    def _embed_batch(self, batch: list[str]) -> list[list[float]]:
+        vectors = self._with_retries(self.inner.embed_documents, batch)
+        self._record(batches=1)
+        return vectors
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        if not texts:
+            return []
+        start = time.perf_counter()
+        batches = [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+        if len(batches) == 1 or self.max_concurrency == 1:
+            results = [self._embed_batch(batch) for batch in batches]
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(batches))) as executor:
+                results = list(executor.map(self._embed_batch, batches))
+        self._record(texts=len(texts), seconds=time.perf_counter() - start)
+        return [vector for batch in results for vector in batch]
+
+    def embed_query(self, text: str) -> list[float]:
+        return self._with_retries(self.inner.embed_query, text)
+
+
+@lru_cache(maxsize=1 << 16)
+def _hash_feature(feature: str) -> int:
+    # crc32 rather than hash(): str hashes are salted per process, and the index is persisted
+    return zlib.crc32(feature.encode())
+
+
+class HashingEmbeddings(Embeddings):
+    """
+    Local, CPU-only embeddings: word unigrams and bigrams are hashed into `dim`
+    signed buckets, damped with log(1 + tf) and L2-normalised. Needs no model
+    download and gives identical vectors in every process.
+    """
+
+    def __init__(self, dim: int = 1024):
+        self.dim = dim
+
+    def _features(self, text: str) -> list[str]:
+        tokens = TOKEN_PATTERN.findall(text.lower())
+        return tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+    def _encode(self, texts: list[str]) -> np.ndarray:
+        rows, hashes = [], []
+        for row, text in enumerate(texts):
+            features = self._features(text)
+            rows += [row] * len(features)
+            hashes += [_hash_feature(feature) for feature in features]
+        hashes = np.asarray(hashes, dtype=np.int64)
+        signs = np.where(hashes & 0x80000000, 1.0, -1.0).astype(np.float32)
+
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        np.add.at(matrix, (np.asarray(rows, dtype=np.int64), hashes % self.dim), signs)
+        matrix = np.sign(matrix) * np.log1p(np.abs(matrix))
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.where(norms == 0, 1.0, norms)
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return self._encode(texts).tolist() if texts else []
+
+    def embed_query(self, text: str) -> list[float]:
+        return self._encode([text])[0].tolist()
+
+
+class SentenceTransformerEmbeddings(Embeddings):
+    """Local sentence-transformers model on CPU, encoding documents in batches."""
+
+    def __init__(self, model_name: str, batch_size: int = 64):
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError as e:
+            raise ImportError(
+                "embedding_backend='sentence-transformers' needs the sentence-transformers package"
+            ) from e
+        self.model = SentenceTransformer(model_name, device="cpu")
+        self.batch_size = batch_size
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        if not texts:
+            return []
+        return self.model.encode(texts, batch_size=self.batch_size, normalize_embeddings=True).tolist()
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.model.encode([text], normalize_embeddings=True)[0].tolist()
+
+
+def embedding_model_id() -> str:
+    """Identifies the configured backend and model; stored in the index manifest so switching forces a rebuild."""
+    backend = settings.embedding_backend
+    if backend == "google":
+        return settings.embedding_model
+    if backend == "hashing":
+        return f"hashing:{settings.hashing_embedding_dim}"
+    if backend == "sentence-transformers":
+        return f"sentence-transformers:{settings.local_embedding_model}"
+    raise ValueError(f"Unknown embedding backend '{backend}'")
+
+
+@lru_cache(maxsize=1)
+def get_embeddings():
+    """Return the embedding client used for the career document index."""
+    backend = settings.embedding_backend
+    if backend == "hashing":
+        return HashingEmbeddings(dim=settings.hashing_embedding_dim)
+    if backend == "sentence-transformers":
+        return SentenceTransformerEmbeddings(settings.local_embedding_model, batch_size=settings.embedding_batch_size)
+    if backend != "google":
+        raise ValueError(f"Unknown embedding backend '{backend}'")
+
+    inner = GoogleGenerativeAIEmbeddings(model=settings.embedding_model, google_api_key=settings.google_api_key)
+    return BatchedEmbeddings(
+        inner,
+        batch_size=settings.embedding_batch_size,
+        max_concurrency=settings.embedding_max_concurrency,
+        max_retries=settings.embedding_max_retries,
+    )
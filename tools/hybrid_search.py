@@ -0,0 +1,135 @@
+import math
+from collections import Counter, defaultdict
+
+import numpy as np
+from tools.text import TOKEN_PATTERN
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "can", "do", "does", "for", "from", "how", "i", "in",
+    "is", "it", "my", "of", "on", "or", "should", "that", "the", "to", "what", "when", "which", "with", "you",
+}
+
+
+def tokenize(text: str) -> list[str]:
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+
+class BM25Index:
+    """
+    Okapi BM25 over a fixed set of chunks. Each posting stores its finished
+    per-term weight, so a query is only a sum over the postings of its terms.
+    """
+
+    def __init__(self, doc_ids: list[str], texts: list[str], k1: float = 1.5, b: float = 0.75):
+        self.doc_ids = list(doc_ids)
+        lengths = np.zeros(len(texts), dtype=np.float32)
+        postings = defaultdict(list)
+        for position, text in enumerate(texts):
+            counts = Counter(tokenize(text))
+            lengths[position] = sum(counts.values())
+            for term, tf in counts.items():
+                postings[term].append((position, tf))
+
+        avg_length = float(lengths.mean()) if len(texts) else 0.0
+        norms = k1 * (1 - b + b * lengths / (avg_length or 1.0))
+        self.postings = {}
+        for term, entries in postings.items():
+            positions = np.asarray([p for p, _ in entries], dtype=np.int64)
+            tfs = np.asarray([tf for _, tf in entries], dtype=np.float32)
+            idf = math.log(1 + (len(texts) - len(entries) + 0.5) / (len(entries) + 0.5))
+            self.postings[term] = (positions, idf * tfs * (k1 + 1) / (tfs + norms[positions]))
+
+    def search(self, query: str, k: int) -> list[tuple[str, float]]:
+        scores = np.zeros(len(self.doc_ids), dtype=np.float32)
+        for term in set(tokenize(query)):
+            if term in self.postings:
+                positions, weights = self.postings[term]
+                scores[positions] += weights
+        matched = np.flatnonzero(scores)
+        top = matched[np.argsort(-scores[matched], kind="stable")[:k]]
+        return [(self.doc_ids[i], float(scores[i])) for i in top]
+
+
+def reciprocal_rank_fusion(rankings: list[list[str]], k: int = 60) -> list[str]:
+    """Merge several ranked ID lists; an ID scores sum(1 / (k + rank)) over the lists it appears in."""
+    scores = defaultdict(float)
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] += 1.0 / (k + rank)
+    return sorted(scores, key=scores.get, reverse=True)
+
+
+class CoverageReranker:
+    """Reorders candidates by the share of distinct query terms they contain; fused order breaks ties."""
+
+    def rerank(self, query: str, texts: list[str]) -> list[int]:
+        terms = set(tokenize(query))
+        if not terms:
+            return list(range(len(texts)))
+        coverage = [len(terms & set(tokenize(text))) / len(terms) for text in texts]
+        return sorted(range(len(texts)), key=lambda i: -coverage[i])
+
+
+class CrossEncoderReranker:
+    """Scores (query, chunk) pairs with a small sentence-transformers cross-encoder on CPU."""
+
+    def __init__(self, model_name: str):
+        try:
+            from sentence_transformers import CrossEncoder
+        except ImportError as e:
+            raise ImportError("reranker='cross-encoder' needs the sentence-transformers package") from e
+        self.model = CrossEncoder(model_name, device="cpu")
+
+    def rerank(self, query: str, texts: list[str]) -> list[int]:
+        scores = self.model.predict([(query, text) for text in texts])
+        return [int(i) for i in np.argsort(-np.asarray(scores), kind="stable")]
+
+
+def get_reranker(name: str, model_name: str = None):
+    if name == "off":
+        return None
+    if name == "coverage":
+        return CoverageReranker()
+    if name == "cross-encoder":
+        return CrossEncoderReranker(model_name)
+    raise ValueError(f"Unknown reranker '{name}'")
+
+
+class HybridSearcher:
+    """
+    Retrieves from a FAISS store and a BM25 index built over the same chunks,
+    fuses both candidate lists with reciprocal rank fusion and optionally
+    reranks the fused head. mode is "hybrid", "vector" or "bm25".
+    """
+
+    def __init__(self, vectorstore, mode: str = "hybrid", candidates: int = 20, rrf_k: int = 60, reranker=None):
+        self.vectorstore = vectorstore
+        self.mode = mode
+        self.candidates = candidates
+        self.rrf_k = rrf_k
+        self.reranker = reranker
+        doc_ids = list(vectorstore.index_to_docstore_id.values())
+        self.bm25 = BM25Index(doc_ids, [vectorstore.docstore.search(doc_id).page_content for doc_id in doc_ids])
+
+    def vector_ids(self, query: str, k: int) -> list[str]:
+        vector = np.asarray([self.vectorstore.embedding_function.embed_query(query)], dtype=np.float32)
+        _, positions = self.vectorstore.index.search(vector, k)
+        return [self.vectorstore.index_to_docstore_id[p] for p in positions[0] if p != -1]
+
+    def bm25_ids(self, query: str, k: int) -> list[str]:
+        return [doc_id for doc_id, _ in self.bm25.search(query, k)]
+
+    def search_ids(self, query: str, k: int) -> list[str]:
+        if self.mode == "vector":
+            fused = self.vector_ids(query, max(k, self.candidates) if self.reranker else k)
+        elif self.mode == "bm25":
+            fused = self.bm25_ids(query, max(k, self.candidates) if self.reranker else k)
+        else:
+            fused = reciprocal_rank_fusion(
+                [self.vector_ids(query, self.candidates), self.bm25_ids(query, self.candidates)], self.rrf_k
+            )
+        if self.reranker is None:
+            return fused[:k]
+        head = fused[:self.candidates]
+        texts = [self.vectorstore.docstore.search(doc_id).page_content for doc_id in head]
+        return [head[i] for i in self.reranker.rerank(query, texts)][:k]
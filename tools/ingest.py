@@ -0,0 +1,143 @@
+import argparse
+import hashlib
+import logging
+import os
+
+from langchain_community.document_loaders import TextLoader, PyMuPDFLoader
+from langchain_community.vectorstores import FAISS
+from src.config import settings
+from tools.ann_index import convert_index, delete_vectors, index_params
+from tools.chunking import chunking_params, split_documents
+from tools.embeddings import embedding_model_id, get_embeddings
+from tools.vector_index import (
+    build_manifest, index_exists, is_index_current, load_index, load_manifest, save_index
+)
+
+logger = logging.getLogger(__name__)
+
+
+def load_source(source: str) -> list:
+    """Load one source file and split it into retrieval chunks."""
+    loader = PyMuPDFLoader(source) if source.endswith(".pdf") else TextLoader(source)
+    return split_documents(loader.load())
+
+
+def chunk_ids(source: str, documents: list) -> list[str]:
+    """
+    Content-addressed IDs for the chunks of one source. Identical chunks in the
+    same source get an occurrence counter so every ID stays unique.
+    """
+    seen = {}
+    ids = []
+    for doc in documents:
+        digest = hashlib.sha256(f"{source}\0{doc.page_content}".encode()).hexdigest()
+        occurrence = seen.get(digest, 0)
+        seen[digest] = occurrence + 1
+        ids.append(digest if occurrence == 0 else f"{digest}-{occurrence}")
+    return ids
+
+
+def sync_index(sources: list[str], embeddings, index_dir: str, embedding_model: str, full: bool = False) -> dict:
+    """
+    Bring the saved index in line with `sources`, embedding only chunks that are
+    new or changed and deleting vectors whose chunk disappeared.
+    Returns counts of added, removed and unchanged chunks.
+    """
+    manifest = build_manifest(sources, embedding_model, chunking_params(), index_params())
+    previous = load_manifest(index_dir)
+    stats = {"added": 0, "removed": 0, "unchanged": 0}
+
+    vectorstore = None
+    old_chunks = {}
+    # Indexes saved without per-chunk IDs, or with other chunk boundaries,
+    # embedding model or index type, cannot be patched and are rebuilt
+    reusable = (
+        "chunks" in previous
+        and previous.get("embedding_model") == embedding_model
+        and previous.get("chunking") == manifest["chunking"]
+        and previous.get("index", {}) == manifest["index"]
+    )
+    if not full and reusable and index_exists(index_dir):
+        vectorstore = load_index(index_dir, embeddings, mmap=False)
+        old_chunks = previous.get("chunks", {})
+
+    new_chunks = {}
+    to_add, to_add_ids, to_remove = [], [], []
+    for source, digest in manifest["sources"].items():
+        if source in old_chunks and previous["sources"].get(source) == digest:
+            new_chunks[source] = old_chunks[source]
+            stats["unchanged"] += len(old_chunks[source])
+            continue
+
+        documents = load_source(source)
+        ids = chunk_ids(source, documents)
+        existing = set(old_chunks.get(source, []))
+        for doc, chunk_id in zip(documents, ids):
+            if chunk_id in existing:
+                stats["unchanged"] += 1
+            else:
+                to_add.append(doc)
+                to_add_ids.append(chunk_id)
+        to_remove += list(existing - set(ids))
+        new_chunks[source] = ids
+
+    for source, ids in old_chunks.items():
+        if source not in manifest["sources"]:
+            to_remove += ids
+
+    if vectorstore is None and not to_add:
+        return stats
+    if not to_add and not to_remove and previous.get("sources") == manifest["sources"]:
+        return stats
+
+    if to_remove:
+        delete_vectors(vectorstore, to_remove, manifest["index"])
+        stats["removed"] = len(to_remove)
+
+    if to_add:
+        if vectorstore is None:
+            vectorstore = FAISS.from_documents(to_add, embeddings, ids=to_add_ids)
+            convert_index(vectorstore, manifest["index"])
+        else:
+            vectorstore.add_documents(to_add, ids=to_add_ids)
+        stats["added"] = len(to_add)
+
+    manifest["chunks"] = new_chunks
+    save_index(vectorstore, index_dir, manifest)
+    logger.info(f"Index sync complete: {stats}")
+    return stats
+
+
+def load_career_index(embeddings):
+    """
+    Return the career FAISS store. The saved index is memory-mapped when every
+    source hash matches its manifest; otherwise an incremental sync runs first.
+    Returns None when there is nothing to index.
+    """
+    sources = [source for source in settings.career_sources if os.path.exists(source)]
+    if not sources:
+        return None
+
+    manifest = build_manifest(sources, embedding_model_id(), chunking_params(), index_params())
+    if not is_index_current(settings.index_dir, manifest):
+        sync_index(sources, embeddings, settings.index_dir, embedding_model_id())
+        if not is_index_current(settings.index_dir, manifest):
+            return None
+
+    return load_index(settings.index_dir, embeddings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incrementally (re)index the career corpus.")
+    parser.add_argument("sources", nargs="*", help="Source files (defaults to settings.career_sources)")
+    parser.add_argument("--full", action="store_true", help="Discard the saved index and re-embed everything")
+    args = parser.parse_args()
+
+    sources = [source for source in (args.sources or settings.career_sources) if os.path.exists(source)]
+    stats = sync_index(sources, get_embeddings(), settings.index_dir, embedding_model_id(), full=args.full)
+    print(f"Added {stats['added']}, removed {stats['removed']}, unchanged {stats['unchanged']} chunk(s).")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
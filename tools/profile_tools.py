@@ -1,35 +1,101 @@
+import asyncio
+import json
+import re
+from contextvars import ContextVar
 import streamlit as st
 from langchain.tools import Tool
-from memory.user_profile import update_user_profile, profile_to_text, get_user_profile
+from memory.user_profile import update_user_profile_fields, profile_to_text, get_user_profile
+
+# Set per request by main.handle_user_input_async; carried into async tasks and executor threads
+active_username: ContextVar[str | None] = ContextVar("active_username", default=None)
 
 def get_active_username() -> str:
+    username = active_username.get()
+    if username:
+        return username
     return st.session_state.get("username", "guest")
 
 def get_user_profile_fn(_: str = "") -> str:
     username = get_active_username()
     return profile_to_text(username)
 
+async def aget_user_profile_fn(input_str: str = "") -> str:
+    return await asyncio.to_thread(get_user_profile_fn, input_str)
+
 get_user_profile_tool = Tool.from_function(
     func=get_user_profile_fn,
+    coroutine=aget_user_profile_fn,
     name="GetUserProfile",
     description="Retrieves the user's current career profile."
 )
 
+def _profile_value(value) -> str:
+    """Profile fields are stored as text: lists become "a, b", other non-strings JSON."""
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, list):
+        return ", ".join(item.strip() if isinstance(item, str) else json.dumps(item) for item in value)
+    return json.dumps(value)
+
+def parse_profile_updates(input_str: str) -> tuple[dict, list[str]]:
+    """
+    Parse one or more profile updates from either a JSON object
+    ({"role": "nurse", "location": "Lagos"}) or field=value pairs separated by
+    newlines or by semicolons followed by another field name, so values such as
+    "skills=Python; SQL; Excel" stay whole. Field names are lower-cased.
+    Returns (fields, fragments that are not field=value pairs).
+    """
+    input_str = input_str.strip().strip("`").strip()
+    if input_str.startswith("{"):
+        try:
+            data = json.loads(input_str)
+        except ValueError:
+            data = None
+        if isinstance(data, dict):
+            return {str(k).strip().lower(): _profile_value(v) for k, v in data.items()}, []
+
+    fields, unparsed = {}, []
+    for part in re.split(r"\n+|;\s*(?=[\w .-]+=)", input_str):
+        part = part.strip().rstrip(";").strip()
+        if not part:
+            continue
+        if "=" not in part:
+            unparsed.append(part)
+            continue
+        key, value = part.split("=", 1)
+        fields[key.strip().lower()] = value.strip()
+    return fields, unparsed
+
 def update_user_profile_fn(input_str: str) -> str:
     username = get_active_username()
-    if "=" not in input_str:
-        return "Invalid format. Use 'field=value'."
-    key, value = input_str.split("=", 1)
-    key, value = key.strip().lower(), value.strip()
+    fields, unparsed = parse_profile_updates(input_str)
+    if unparsed:
+        return (f"Could not read {', '.join(repr(part) for part in unparsed)}; nothing was updated. "
+                "Use 'field=value' (one per line or separated by ';') or a JSON object.")
+    if not fields:
+        return "Invalid format. Use 'field=value' (one per line or separated by ';') or a JSON object."
+    # Keys become MongoDB field paths; reject operators, dotted paths and reserved fields
+    invalid = [key for key in fields if not key or key == "username" or key.startswith(("$", "_")) or "." in key]
+    if invalid:
+        return f"Invalid field name(s): {', '.join(repr(key) for key in invalid)}."
 
-    success = update_user_profile(username, key, value)
+    success = update_user_profile_fields(username, fields)
     if success:
-        return f"✅ Updated {key} to '{value}'.\n\nCurrent profile:\n{profile_to_text(username)}"
+        updated = ", ".join(f"{key} to '{value}'" for key, value in fields.items())
+        return f"✅ Updated {updated}.\n\nCurrent profile:\n{profile_to_text(username)}"
     else:
         return "❌ Failed to update profile."
 
+async def aupdate_user_profile_fn(input_str: str) -> str:
+    return await asyncio.to_thread(update_user_profile_fn, input_str)
+
 update_user_profile_tool = Tool.from_function(
     func=update_user_profile_fn,
+    coroutine=aupdate_user_profile_fn,
     name="UpdateUserProfile",
-    description="Updates the user's career profile. Input format: field=value"
+    description=(
+        "Updates the user's career profile. Record every trait you learned in one call. "
+        "Input format: field=value pairs, one per line or separated by ';' "
+        "(e.g. 'role=nurse; location=Lagos; experience=3 years'), or a JSON object."
+    )
 )
\ No newline at end of file
@@ -0,0 +1,61 @@
+import hashlib
+import threading
+
+from tools.text import normalize_query
+from tools.ttl_cache import TTLCache
+
+
+class RetrievalCache:
+    """
+    Two-tier cache for the document search tool:
+      1. query -> top-k docstore IDs (skips query embedding and vector search)
+      2. (query, retrieved doc IDs) -> QA answer (skips the answering LLM call)
+    Both tiers are tied to an index version; switching to a new version empties them.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.version = None
+        self._doc_ids = TTLCache(max_entries, ttl_seconds)
+        self._answers = TTLCache(max_entries, ttl_seconds)
+        self._lock = threading.Lock()
+        self._metrics = {"doc_id_hits": 0, "doc_id_misses": 0, "answer_hits": 0, "answer_misses": 0}
+
+    def set_version(self, version: str):
+        """Invalidate everything cached for a previous index version."""
+        with self._lock:
+            if version == self.version:
+                return
+            self.version = version
+        self._doc_ids.clear()
+        self._answers.clear()
+
+    def _count(self, key: str):
+        with self._lock:
+            self._metrics[key] += 1
+
+    def _answer_key(self, query: str, doc_ids: list[str]) -> str:
+        joined = "\0".join(doc_ids)
+        return hashlib.sha256(f"{self.version}\0{normalize_query(query)}\0{joined}".encode()).hexdigest()
+
+    def get_doc_ids(self, query: str):
+        doc_ids = self._doc_ids.get((self.version, normalize_query(query)))
+        self._count("doc_id_hits" if doc_ids is not None else "doc_id_misses")
+        return doc_ids
+
+    def put_doc_ids(self, query: str, doc_ids: list[str]):
+        self._doc_ids.set((self.version, normalize_query(query)), list(doc_ids))
+
+    def get_answer(self, query: str, doc_ids: list[str]):
+        answer = self._answers.get(self._answer_key(query, doc_ids))
+        self._count("answer_hits" if answer is not None else "answer_misses")
+        return answer
+
+    def put_answer(self, query: str, doc_ids: list[str], answer: str):
+        self._answers.set(self._answer_key(query, doc_ids), answer)
+
+    def metrics(self) -> dict:
+        with self._lock:
+            metrics = dict(self._metrics)
+        metrics["doc_id_entries"] = len(self._doc_ids)
+        metrics["answer_entries"] = len(self._answers)
+        return metrics
@@ -0,0 +1,9 @@
+import re
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def normalize_query(text: str) -> str:
+    """Lower-case, drop punctuation and collapse whitespace so trivial variants share a key."""
+    text = re.sub(r"[^\w\s]", " ", text.lower())
+    return " ".join(text.split())
@@ -0,0 +1,26 @@
+import asyncio
+from langchain.tools import Tool
+from documents.upload_index import upload_index_store
+from src.config import settings
+from tools.profile_tools import get_active_username
+
+NO_UPLOAD_MESSAGE = "The user has not uploaded a document in this session (or it has expired). Ask them to upload it again."
+
+def uploaded_doc_search_fn(query: str) -> str:
+    docs = upload_index_store.search(get_active_username(), query, settings.upload_index_k)
+    if not docs:
+        return NO_UPLOAD_MESSAGE
+    return "\n\n".join(f"[{doc.metadata.get('source')}, part {doc.metadata.get('chunk', 0) + 1}]\n{doc.page_content}" for doc in docs)
+
+async def auploaded_doc_search_fn(query: str) -> str:
+    return await asyncio.to_thread(uploaded_doc_search_fn, query)
+
+upload_search_tool = Tool.from_function(
+    func=uploaded_doc_search_fn,
+    coroutine=auploaded_doc_search_fn,
+    name="UploadedDocSearcher",
+    description=(
+        "Searches the documents the user uploaded (CV, cover letter, reports) and returns the most relevant passages. "
+        "Use it for follow-up questions about their document, e.g. 'experience section' or 'skills listed'."
+    )
+)
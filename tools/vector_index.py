@@ -0,0 +1,114 @@
+import hashlib
+import json
+import os
+import pickle
+from pathlib import Path
+
+import faiss
+from langchain_community.vectorstores import FAISS
+from tools.ann_index import apply_search_params
+
+INDEX_FILE = "index.faiss"
+DOCSTORE_FILE = "index.pkl"
+MANIFEST_FILE = "manifest.json"
+
+
+def file_sha256(path: str) -> str:
+    """Return the SHA-256 hex digest of a file, read in 1 MB blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def build_manifest(sources: list[str], embedding_model: str, chunking: dict = None, index: dict = None) -> dict:
+    """Describe the inputs an index was built from: source hashes, embedding model,
+    chunking parameters and ANN index type."""
+    return {
+        "embedding_model": embedding_model,
+        "chunking": chunking or {},
+        "index": index or {},
+        "sources": {source: file_sha256(source) for source in sources if os.path.exists(source)},
+    }
+
+
+def load_manifest(index_dir: str) -> dict:
+    """Return the manifest saved next to the index, or an empty dict if there is none."""
+    path = Path(index_dir) / MANIFEST_FILE
+    if not path.exists():
+        return {}
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def manifest_version(manifest: dict) -> str:
+    """Short, stable identifier for the index contents described by a manifest."""
+    identity = {key: manifest.get(key) for key in ("embedding_model", "chunking", "index", "sources")}
+    return hashlib.sha256(json.dumps(identity, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def index_exists(index_dir: str) -> bool:
+    path = Path(index_dir)
+    return (path / INDEX_FILE).exists() and (path / DOCSTORE_FILE).exists()
+
+
+def is_index_current(index_dir: str, manifest: dict) -> bool:
+    """True if a saved index exists and was built from exactly these inputs."""
+    if not index_exists(index_dir):
+        return False
+    saved = load_manifest(index_dir)
+    return (
+        saved.get("embedding_model") == manifest["embedding_model"]
+        and saved.get("chunking", {}) == manifest["chunking"]
+        and saved.get("index", {}) == manifest.get("index", {})
+        and saved.get("sources") == manifest["sources"]
+    )
+
+
+def save_index(vectorstore: FAISS, index_dir: str, manifest: dict):
+    """Persist vectors, docstore and manifest. Files are written under temporary
+    names and renamed into place, so processes that have the old index
+    memory-mapped keep reading the old file. The manifest is written last so an
+    interrupted save is detected as stale on the next start."""
+    path = Path(index_dir)
+    path.mkdir(parents=True, exist_ok=True)
+    (path / MANIFEST_FILE).unlink(missing_ok=True)
+
+    tmp_name = f"index.tmp-{os.getpid()}"
+    vectorstore.save_local(str(path), index_name=tmp_name)
+    os.replace(path / f"{tmp_name}.faiss", path / INDEX_FILE)
+    os.replace(path / f"{tmp_name}.pkl", path / DOCSTORE_FILE)
+
+    tmp_manifest = path / (MANIFEST_FILE + ".tmp")
+    with open(tmp_manifest, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_manifest, path / MANIFEST_FILE)
+
+
+def _read_faiss_index(path: str):
+    """
+    Memory-map the index file when FAISS supports it. IO_FLAG_MMAP only maps the
+    inverted lists of IVF indexes; IO_FLAG_MMAP_IFC (newer FAISS) also maps flat
+    and HNSW storage. Falls back to reading the file into memory.
+    """
+    flag = getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP)
+    try:
+        return faiss.read_index(path, flag | faiss.IO_FLAG_READ_ONLY)
+    except RuntimeError:
+        return faiss.read_index(path)
+
+
+def load_index(index_dir: str, embeddings, mmap: bool = True) -> FAISS:
+    """Load a saved index without re-embedding anything. Pass mmap=False when the
+    index is going to be modified."""
+    path = Path(index_dir)
+    index = _read_faiss_index(str(path / INDEX_FILE)) if mmap else faiss.read_index(str(path / INDEX_FILE))
+    # The pickle is only ever written by save_index above.
+    with open(path / DOCSTORE_FILE, "rb") as f:
+        docstore, index_to_docstore_id = pickle.load(f)
+    apply_search_params(index)
+    return FAISS(embeddings, index, docstore, index_to_docstore_id)